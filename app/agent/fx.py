@@ -0,0 +1,176 @@
+"""Local FX rate table with an in-memory cache for converting balances to the profile currency."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable, Mapping
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.calculators.payday import money
+from app.db.models import FxRate
+
+RATE_CACHE_SIZE = 4096
+
+# (base, quote, on) -> (rate, effective_date of the stored rate used)
+_rate_cache: dict[tuple[str, str, date], tuple[Decimal, str]] = {}
+_rate_cache_lock = threading.Lock()
+# Bumped on every clear so a lookup that raced a rate upsert does not cache the old rate.
+_rate_cache_generation = 0
+
+
+class MissingFxRateError(LookupError):
+    """No stored rate converts a currency on or before the requested date."""
+
+
+def clear_fx_cache() -> None:
+    global _rate_cache_generation
+    with _rate_cache_lock:
+        _rate_cache.clear()
+        _rate_cache_generation += 1
+
+
+def store_fx_rates(session: Session, rates: Iterable[Mapping[str, object]]) -> int:
+    """Insert or replace ``{base_currency, quote_currency, effective_date, rate}`` rows."""
+    rows = [
+        {
+            "base_currency": str(r["base_currency"]).upper(),
+            "quote_currency": str(r["quote_currency"]).upper(),
+            "effective_date": r["effective_date"].isoformat()
+            if isinstance(r["effective_date"], date)
+            else str(r["effective_date"]),
+            "rate": Decimal(str(r["rate"])),
+        }
+        for r in rates
+    ]
+    if not rows:
+        return 0
+    stmt = insert(FxRate).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["base_currency", "quote_currency", "effective_date"],
+        set_={"rate": stmt.excluded.rate},
+    )
+    session.execute(stmt)
+    session.commit()
+    clear_fx_cache()
+    return len(rows)
+
+
+def _latest_rates(session: Session, currencies: list[str], quote: str, on: date) -> dict[str, tuple[Decimal, str]]:
+    """Latest rate on or before ``on`` converting each currency into ``quote``, in one query.
+
+    Each currency's direct ``currency -> quote`` rate is preferred; without one, the inverse of
+    its ``quote -> currency`` rate is used.
+    """
+    # Both directions come back from one grouped lookup, keyed by the foreign side of the pair.
+    foreign = case((FxRate.quote_currency == quote, FxRate.base_currency), else_=FxRate.quote_currency)
+    latest = (
+        select(
+            FxRate.base_currency,
+            FxRate.quote_currency,
+            func.max(FxRate.effective_date).label("effective_date"),
+        )
+        .where(
+            or_(
+                and_(FxRate.quote_currency == quote, FxRate.base_currency.in_(currencies)),
+                and_(FxRate.base_currency == quote, FxRate.quote_currency.in_(currencies)),
+            ),
+            FxRate.effective_date <= on.isoformat(),
+        )
+        .group_by(FxRate.base_currency, FxRate.quote_currency)
+        .subquery()
+    )
+    rows = session.execute(
+        select(foreign, FxRate.quote_currency == quote, FxRate.rate, FxRate.effective_date).join(
+            latest,
+            and_(
+                FxRate.base_currency == latest.c.base_currency,
+                FxRate.quote_currency == latest.c.quote_currency,
+                FxRate.effective_date == latest.c.effective_date,
+            ),
+        )
+    )
+    direct: dict[str, tuple[Decimal, str]] = {}
+    inverse: dict[str, tuple[Decimal, str]] = {}
+    for currency, is_direct, rate, effective in rows:
+        rate = Decimal(str(rate))
+        if is_direct:
+            direct[currency] = (rate, effective)
+        elif rate != 0:
+            inverse[currency] = (Decimal(1) / rate, effective)
+    return {**inverse, **direct}
+
+
+def resolve_rates(session: Session, currencies: Iterable[str], quote: str, on: date) -> dict[str, tuple[Decimal, str]]:
+    """Rates converting each currency into ``quote`` as of ``on``; cache misses share one lookup.
+
+    A missing direct rate falls back to the inverse of a stored ``quote -> currency`` rate from
+    the same query. Raises ``MissingFxRateError`` when neither exists.
+    """
+    resolved: dict[str, tuple[Decimal, str]] = {}
+    misses = []
+    for currency in set(currencies):
+        if currency == quote:
+            continue
+        cached = _rate_cache.get((currency, quote, on))
+        if cached is not None:
+            resolved[currency] = cached
+        else:
+            misses.append(currency)
+
+    if misses:
+        generation = _rate_cache_generation
+        found = _latest_rates(session, misses, quote, on)
+        missing = sorted(c for c in misses if c not in found)
+        if missing:
+            raise MissingFxRateError(
+                f"No FX rate to {quote} on or before {on.isoformat()} for: {', '.join(missing)}"
+            )
+        with _rate_cache_lock:
+            if generation != _rate_cache_generation:
+                return {**resolved, **found}
+            if len(_rate_cache) + len(found) > RATE_CACHE_SIZE:
+                _rate_cache.clear()
+            for currency, value in found.items():
+                _rate_cache[(currency, quote, on)] = value
+        resolved.update(found)
+    return resolved
+
+
+def convert_balances(
+    session: Session,
+    balances: Mapping[str, Decimal],
+    quote: str,
+    on: date,
+) -> tuple[Decimal, list[dict[str, str]]]:
+    """Total of ``balances`` (per currency) in ``quote`` and a record of each conversion made."""
+    quote = quote.upper()
+    normalized: dict[str, Decimal] = {}
+    for currency, amount in balances.items():
+        normalized[currency.upper()] = normalized.get(currency.upper(), Decimal("0.00")) + amount
+    balances = normalized
+    rates = resolve_rates(session, balances.keys(), quote, on)
+    total = Decimal("0.00")
+    conversions = []
+    for currency in sorted(balances):
+        amount = balances[currency]
+        if currency == quote:
+            total += amount
+            continue
+        rate, effective_date = rates[currency]
+        converted = money(amount * rate)
+        total += converted
+        conversions.append(
+            {
+                "currency": currency,
+                "amount": str(amount),
+                "rate": str(rate),
+                "rate_date": effective_date,
+                "converted": str(converted),
+            }
+        )
+    return money(total), conversions
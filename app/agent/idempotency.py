@@ -0,0 +1,182 @@
+"""Idempotency-Key handling so client retries replay a stored plan instead of recomputing it."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.models import IdempotencyKey
+
+IDEMPOTENCY_TTL = timedelta(hours=24)
+# How long a duplicate waits on an in-flight request before giving up with a 409.
+WAIT_TIMEOUT_SECONDS = 30.0
+# How old a pending claim may get before it is treated as abandoned (the owning process crashed
+# before storing anything). Well above the wait budget so a slow plan is never taken over by a
+# duplicate from another process while it is still running.
+CLAIM_LEASE_SECONDS = 600.0
+POLL_INTERVAL_SECONDS = 0.05
+SWEEP_INTERVAL_SECONDS = 60.0
+
+_inflight: dict[str, threading.Event] = {}
+_inflight_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+class IdempotencyKeyConflict(ValueError):
+    """The key was already used with a different request payload."""
+
+
+class IdempotencyKeyTimeout(TimeoutError):
+    """An in-flight request with the same key did not finish in time."""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def request_fingerprint(payload: dict[str, object]) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def sweep_expired_keys(session: Session, now: datetime | None = None) -> int:
+    result = session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= (now or _utcnow())))
+    session.commit()
+    return result.rowcount or 0
+
+
+def _maybe_sweep(session: Session) -> None:
+    global _last_sweep
+    now = time.monotonic()
+    if now - _last_sweep < SWEEP_INTERVAL_SECONDS:
+        return
+    _last_sweep = now
+    sweep_expired_keys(session)
+
+
+def _load_key(session: Session, key: str) -> IdempotencyKey | None:
+    stmt = select(IdempotencyKey).where(IdempotencyKey.key == key).execution_options(populate_existing=True)
+    return session.scalars(stmt).one_or_none()
+
+
+def _claim_or_replay(session: Session, key: str, fingerprint: str, deadline: float) -> dict[str, object] | None:
+    """Insert a pending claim for ``key`` and return None, or return the stored response."""
+    while True:
+        now = _utcnow()
+        row = _load_key(session, key)
+        abandoned = (
+            row is not None
+            and row.status == "pending"
+            and row.created_at + timedelta(seconds=CLAIM_LEASE_SECONDS) <= now
+        )
+        if row is not None and (row.expires_at <= now or abandoned):
+            session.delete(row)
+            session.commit()
+            row = None
+
+        if row is None:
+            session.add(
+                IdempotencyKey(
+                    key=key,
+                    fingerprint=fingerprint,
+                    status="pending",
+                    created_at=now,
+                    expires_at=now + IDEMPOTENCY_TTL,
+                )
+            )
+            try:
+                session.commit()
+            except IntegrityError:
+                # Another process claimed the key between our read and insert.
+                session.rollback()
+                continue
+            return None
+
+        if row.fingerprint != fingerprint:
+            raise IdempotencyKeyConflict("Idempotency-Key was already used with a different request payload")
+        if row.status == "completed" and row.response_json:
+            return json.loads(row.response_json)
+
+        # Pending in another process: poll until it completes or the wait budget runs out.
+        if time.monotonic() >= deadline:
+            raise IdempotencyKeyTimeout("A request with this Idempotency-Key is still in progress")
+        time.sleep(POLL_INTERVAL_SECONDS)
+
+
+def record_response(session: Session, key: str, response: dict[str, object]) -> None:
+    """Mark the pending claim for ``key`` completed with ``response`` without committing.
+
+    Callers that persist side effects stage this in the same transaction, so a crash can never
+    leave those effects stored behind a claim that a retry would recompute.
+    """
+    row = _load_key(session, key)
+    if row is None or row.status != "pending":
+        return
+    row.status = "completed"
+    row.response_json = json.dumps(response)
+
+
+def _complete(session: Session, key: str, response: dict[str, object]) -> None:
+    record_response(session, key, response)
+    session.commit()
+
+
+def _release(session: Session, key: str) -> None:
+    session.rollback()
+    session.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status == "pending"))
+    session.commit()
+
+
+def run_idempotent(
+    session: Session,
+    key: str,
+    fingerprint: str,
+    compute: Callable[[], dict[str, object]],
+) -> tuple[dict[str, object], bool]:
+    """Run ``compute`` at most once per key within the TTL.
+
+    Returns ``(response, replayed)``. Duplicates arriving while the first request is still
+    running wait for it (in-process via an event, across processes by polling the key row)
+    and then receive the stored response. A ``compute`` that writes to the database should stage
+    ``record_response`` in its own commit; otherwise the response is stored after it returns.
+    """
+    _maybe_sweep(session)
+    deadline = time.monotonic() + WAIT_TIMEOUT_SECONDS
+
+    while True:
+        with _inflight_lock:
+            event = _inflight.get(key)
+            owner = event is None
+            if owner:
+                event = _inflight[key] = threading.Event()
+
+        if not owner:
+            if not event.wait(max(0.0, deadline - time.monotonic())):
+                raise IdempotencyKeyTimeout("A request with this Idempotency-Key is still in progress")
+            continue
+
+        claimed = False
+        try:
+            stored = _claim_or_replay(session, key, fingerprint, deadline)
+            if stored is not None:
+                return stored, True
+            claimed = True
+            response = compute()
+            _complete(session, key, response)
+            return response, False
+        except BaseException:
+            if claimed:
+                _release(session, key)
+            raise
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+            event.set()
@@ -0,0 +1,87 @@
+"""Transaction ledger posting with incrementally maintained account balances."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Sequence
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.calculators.payday import money
+from app.db.models import Account as AccountModel
+from app.db.models import LedgerEntry
+from app.domain.models import Transaction
+from app.domain.tables import from_cents, to_cents
+
+LIQUID_ACCOUNT_TYPES = ("checking", "savings")
+
+
+class UnknownAccountError(LookupError):
+    """A posting referenced an account id that does not exist."""
+
+
+def post_transactions(session: Session, transactions: Sequence[Transaction]) -> dict[int, Decimal]:
+    """Append ``transactions`` to the ledger and return the new balance of each touched account.
+
+    Balances are bumped in SQL first, which takes the write lock, so the running totals derived
+    afterwards cannot interleave with a concurrent posting. Entries and balance updates commit
+    together.
+    """
+    if not transactions:
+        return {}
+
+    deltas: dict[int, int] = defaultdict(int)
+    for txn in transactions:
+        deltas[txn.account_id] += to_cents(txn.amount)
+
+    for account_id, delta in deltas.items():
+        session.execute(
+            update(AccountModel)
+            .where(AccountModel.id == account_id)
+            .values(balance=AccountModel.balance + from_cents(delta))
+        )
+    balances = {
+        row.id: to_cents(row.balance)
+        for row in session.execute(
+            select(AccountModel.id, AccountModel.balance).where(AccountModel.id.in_(deltas.keys()))
+        )
+    }
+    missing = sorted(deltas.keys() - balances.keys())
+    if missing:
+        session.rollback()
+        raise UnknownAccountError(f"Unknown account ids: {', '.join(str(m) for m in missing)}")
+
+    running = {account_id: balances[account_id] - delta for account_id, delta in deltas.items()}
+    rows = []
+    for txn in transactions:
+        cents = to_cents(txn.amount)
+        running[txn.account_id] += cents
+        rows.append(
+            {
+                "account_id": txn.account_id,
+                "posted_on": txn.posted_on.isoformat(),
+                "amount_cents": cents,
+                "balance_after_cents": running[txn.account_id],
+                "description": txn.description,
+            }
+        )
+    session.execute(insert(LedgerEntry), rows)
+    # Store the exact cent value back so float drift from the SQL-side addition never accumulates.
+    session.execute(
+        update(AccountModel),
+        [{"id": account_id, "balance": from_cents(cents)} for account_id, cents in balances.items()],
+    )
+    session.commit()
+    return {account_id: from_cents(cents) for account_id, cents in balances.items()}
+
+
+def liquid_cash_by_currency(session: Session) -> dict[str, Decimal]:
+    """Checking and savings balances summed per currency in one aggregate over ``ix_accounts_type``."""
+    rows = session.execute(
+        select(AccountModel.currency, func.sum(AccountModel.balance))
+        .where(AccountModel.type.in_(LIQUID_ACCOUNT_TYPES))
+        .group_by(AccountModel.currency)
+    )
+    return {currency: money(Decimal(str(total or 0))) for currency, total in rows}
@@ -2,20 +2,27 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 from datetime import date, timedelta
 from decimal import Decimal
 from uuid import uuid4
 
-from sqlalchemy import desc, select
+from sqlalchemy import desc, func, select, text, update
 from sqlalchemy.orm import Session
 
+from app.agent.fx import convert_balances
+from app.agent.idempotency import record_response
+from app.agent.ledger import liquid_cash_by_currency
+from app.agent.plan_analytics import plan_analytics_rows
+from app.agent.plan_events import plan_broadcaster
 from app.calculators.payday import compute_plan, resolve_period_end
-from app.db.models import Account as AccountModel
+from app.calculators.timeline import compute_timeline
+from app.calculators.waterfall import compile_rules, waterfall_for_profile
 from app.db.models import Bill as BillModel
 from app.db.models import Debt as DebtModel
-from app.db.models import IncomeSchedule, PlanRun, Preference
-from app.domain.models import Bill, Debt
+from app.db.models import IncomeSchedule, PlanRun, Preference, payload_etag
+from app.domain.tables import BillTable, DebtTable
 
 
 def d(value: object) -> Decimal:
@@ -43,15 +50,6 @@ def _determine_period_end(
     return resolve_period_end(paycheck_date)
 
 
-def _sum_liquid_cash(session: Session) -> Decimal:
-    accounts = session.scalars(select(AccountModel)).all()
-    total = Decimal("0.00")
-    for account in accounts:
-        if account.type in {"checking", "savings"}:
-            total += d(account.balance)
-    return total
-
-
 def generate_payday_plan(
     session: Session,
     paycheck_amount: Decimal,
@@ -59,6 +57,8 @@ def generate_payday_plan(
     override_buffer_amount: Decimal | None = None,
     next_paycheck_date: date | None = None,
     use_income_schedule: bool = True,
+    include_timeline: bool = False,
+    idempotency_key: str | None = None,
 ) -> dict[str, object]:
     pref = session.scalar(select(Preference).limit(1))
     buffer_amount = d(pref.buffer_amount_per_paycheck) if pref else Decimal("600.00")
@@ -66,26 +66,35 @@ def generate_payday_plan(
     primary_surplus_target = pref.primary_surplus_target if pref else "invest"
     if override_buffer_amount is not None:
         buffer_amount = d(override_buffer_amount)
+    waterfall = None
+    if pref and pref.allocation_rules:
+        waterfall = waterfall_for_profile(pref.id, pref.allocation_rules_version, pref.allocation_rules)
 
-    bills = [
-        Bill(
-            id=b.id,
-            name=b.name,
-            amount=d(b.amount),
-            cadence=b.cadence,
-            due_day=b.due_day,
-            autopay=b.autopay,
-            weekday_anchor=b.weekday_anchor,
+    # Read plain column tuples straight into columnar tables; no ORM instances per row.
+    bills = BillTable.from_rows(
+        session.execute(
+            select(
+                BillModel.id,
+                BillModel.name,
+                BillModel.amount,
+                BillModel.cadence,
+                BillModel.due_day,
+                BillModel.autopay,
+                BillModel.weekday_anchor,
+            )
         )
-        for b in session.scalars(select(BillModel)).all()
-    ]
-    debts = [
-        Debt(id=x.id, name=x.name, balance=d(x.balance), apr=d(x.apr), min_payment=d(x.min_payment))
-        for x in session.scalars(select(DebtModel)).all()
-    ]
+    )
+    debts = DebtTable.from_rows(
+        session.execute(
+            select(DebtModel.id, DebtModel.name, DebtModel.balance, DebtModel.apr, DebtModel.min_payment)
+        )
+    )
 
     period_end = _determine_period_end(session, paycheck_date, next_paycheck_date, use_income_schedule)
-    starting_liquid_cash = _sum_liquid_cash(session)
+    profile_currency = pref.currency if pref else "CAD"
+    starting_liquid_cash, fx_conversions = convert_balances(
+        session, liquid_cash_by_currency(session), profile_currency, paycheck_date
+    )
 
     calc = compute_plan(
         paycheck_amount=d(paycheck_amount),
@@ -97,6 +106,7 @@ def generate_payday_plan(
         min_cash_buffer=min_cash_buffer,
         primary_surplus_target=primary_surplus_target,
         starting_liquid_cash=starting_liquid_cash,
+        waterfall=waterfall,
     )
 
     checks = calc["checks"]
@@ -132,6 +142,8 @@ def generate_payday_plan(
                 for row in calc["details"]["bills_funded"]
             ],
             "unfunded_items": calc["details"]["unfunded_items"],
+            "currency": profile_currency,
+            "fx_conversions": fx_conversions,
         },
         "inputs": {
             "paycheck_amount": str(d(paycheck_amount)),
@@ -142,34 +154,118 @@ def generate_payday_plan(
             "primary_surplus_target": primary_surplus_target,
         },
     }
+    if waterfall is not None:
+        response_payload["inputs"]["allocation_rules_version"] = pref.allocation_rules_version
+    if include_timeline:
+        response_payload["timeline"] = compute_timeline(
+            bills, d(paycheck_amount), paycheck_date, period_end, starting_liquid_cash
+        )
 
     plan_id = str(uuid4())
-    session.add(
-        PlanRun(
-            id=plan_id,
-            paycheck_date=paycheck_date.isoformat(),
-            paycheck_amount=d(paycheck_amount),
-            checks_summary=_checks_summary(checks),
-            plan_json=json.dumps(response_payload),
+    plan_json = json.dumps(response_payload)
+    run = PlanRun(
+        id=plan_id,
+        paycheck_date=paycheck_date.isoformat(),
+        paycheck_amount=d(paycheck_amount),
+        checks_summary=_checks_summary(checks),
+        plan_json=plan_json,
+        etag=payload_etag(plan_json),
+    )
+    session.add(run)
+    session.add_all(plan_analytics_rows(plan_id, run.paycheck_date, calc["allocations"], checks))
+    result = {"plan_id": plan_id, **response_payload}
+    if idempotency_key is not None:
+        # Completed in the same commit as the plan, so a retry can never store a second one.
+        record_response(session, idempotency_key, result)
+    session.commit()
+    if plan_broadcaster.has_subscribers:
+        # Reading created_at reloads the server-side default; only pay for it when someone listens.
+        plan_broadcaster.publish(_plan_run_summary(run))
+
+    return result
+
+
+def get_allocation_rules(session: Session) -> dict[str, object]:
+    pref = session.scalar(select(Preference).limit(1))
+    if not pref:
+        return {"version": 0, "rules": None}
+    rules = json.loads(pref.allocation_rules) if pref.allocation_rules else None
+    return {"version": pref.allocation_rules_version, "rules": rules}
+
+
+def set_allocation_rules(session: Session, rules: list[dict[str, object]] | None) -> dict[str, object]:
+    """Validate and store the profile's allocation rules; ``None`` restores the default waterfall.
+
+    Raises ``InvalidAllocationRules``. Each change bumps the version that compiled waterfalls are
+    cached against.
+    """
+    if rules is not None:
+        compile_rules(rules)
+    pref_id = session.scalar(select(Preference.id).limit(1))
+    if pref_id is None:
+        pref = Preference()
+        session.add(pref)
+        session.flush()
+        pref_id = pref.id
+    # Rules and version change in one statement, so every version names exactly one rule set even
+    # when updates race; compiled waterfalls are cached by (profile, version) and never rechecked.
+    version = session.scalar(
+        update(Preference)
+        .where(Preference.id == pref_id)
+        .values(
+            allocation_rules=json.dumps(rules) if rules is not None else None,
+            allocation_rules_version=func.coalesce(Preference.allocation_rules_version, 0) + 1,
         )
+        .returning(Preference.allocation_rules_version)
     )
     session.commit()
+    return {"version": version, "rules": rules}
 
-    return {"plan_id": plan_id, **response_payload}
+
+def _plan_run_summary(run: PlanRun) -> dict[str, object]:
+    return {
+        "plan_id": run.id,
+        "created_at": str(run.created_at),
+        "paycheck_date": run.paycheck_date,
+        "paycheck_amount": str(run.paycheck_amount) if run.paycheck_amount is not None else None,
+        "checks_summary": run.checks_summary,
+    }
 
 
 def list_plan_runs(session: Session, limit: int = 20) -> list[dict[str, object]]:
-    runs = session.scalars(select(PlanRun).order_by(desc(PlanRun.created_at)).limit(limit)).all()
-    return [
-        {
-            "plan_id": run.id,
-            "created_at": str(run.created_at),
-            "paycheck_date": run.paycheck_date,
-            "paycheck_amount": str(run.paycheck_amount) if run.paycheck_amount is not None else None,
-            "checks_summary": run.checks_summary,
-        }
-        for run in runs
-    ]
+    runs = session.scalars(select(PlanRun).order_by(desc(PlanRun.created_at), desc(PlanRun.id)).limit(limit)).all()
+    return [_plan_run_summary(run) for run in runs]
+
+
+def plan_list_etag(session: Session, limit: int = 20) -> str:
+    """ETag for the ``list_plan_runs`` page, derived from the ids it would return.
+
+    Plan runs are immutable once stored, so the page only changes when its ids change; the
+    ids are read from the ``(created_at, id)`` index without touching the table rows.
+    """
+    ids = session.scalars(
+        select(PlanRun.id).order_by(desc(PlanRun.created_at), desc(PlanRun.id)).limit(limit)
+    ).all()
+    return hashlib.sha256("\n".join(ids).encode("utf-8")).hexdigest()[:32]
+
+
+# SQLite's planner picks the primary-key index for ``id = ?`` and then reads the table row, which
+# means stepping over plan_json (etag was added later, so it sits after it). Pin the covering index.
+_PLAN_ETAG_QUERY = text("SELECT id, etag FROM plan_runs INDEXED BY ix_plan_runs_id_etag WHERE id = :plan_id")
+
+
+def get_plan_etag(session: Session, plan_id: str) -> str | None:
+    """ETag for a stored plan, or None when the plan does not exist. Reads only ``ix_plan_runs_id_etag``."""
+    row = session.execute(_PLAN_ETAG_QUERY, {"plan_id": plan_id}).first()
+    if row is None:
+        return None
+    if row.etag:
+        return row.etag
+    # Plans stored before ETags existed: compute once and persist.
+    run = session.get(PlanRun, plan_id)
+    run.etag = payload_etag(run.plan_json or "")
+    session.commit()
+    return run.etag
 
 
 def get_plan_run(session: Session, plan_id: str) -> dict[str, object] | None:
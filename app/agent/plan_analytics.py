@@ -0,0 +1,134 @@
+"""Normalized plan allocation/check rows and SQL-side aggregates over them."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable, Iterable, Mapping
+from datetime import date
+
+from sqlalchemy import ColumnElement, Integer, cast, exists, func, select
+from sqlalchemy.orm import Session
+
+from app.db.models import PlanAllocation, PlanCheck, PlanRun
+from app.domain.tables import from_cents, to_cents
+
+# Length of the paycheck_date prefix that identifies each reporting period.
+STATS_PERIODS = {"day": 10, "month": 7, "year": 4}
+
+
+def plan_analytics_rows(
+    plan_id: str,
+    paycheck_date: str,
+    allocations: Iterable[Mapping[str, object]],
+    checks: Mapping[str, bool],
+) -> list[PlanAllocation | PlanCheck]:
+    rows: list[PlanAllocation | PlanCheck] = [
+        PlanAllocation(
+            plan_id=plan_id,
+            paycheck_date=paycheck_date,
+            bucket=str(a["bucket"]),
+            amount_cents=to_cents(a["amount"]),
+        )
+        for a in allocations
+    ]
+    rows.extend(
+        PlanCheck(plan_id=plan_id, paycheck_date=paycheck_date, name=name, passed=bool(passed))
+        for name, passed in checks.items()
+    )
+    return rows
+
+
+def _missing_analytics() -> ColumnElement[bool]:
+    return ~exists().where(PlanAllocation.plan_id == PlanRun.id)
+
+
+def count_plans_missing_analytics(session: Session) -> int:
+    stmt = select(func.count(PlanRun.id)).where(
+        _missing_analytics(), PlanRun.plan_json.is_not(None), PlanRun.paycheck_date.is_not(None)
+    )
+    return session.scalar(stmt) or 0
+
+
+def backfill_plan_analytics(
+    session: Session,
+    batch_size: int = 500,
+    progress: Callable[[int], None] | None = None,
+) -> int:
+    """Normalize plans stored before the analytics tables existed. Returns the number backfilled."""
+    done = 0
+    last_id = ""
+    while True:
+        batch = session.execute(
+            select(PlanRun.id, PlanRun.paycheck_date, PlanRun.plan_json)
+            .where(PlanRun.id > last_id, _missing_analytics())
+            .order_by(PlanRun.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return done
+        for row in batch:
+            if not row.plan_json or not row.paycheck_date:
+                continue
+            plan = json.loads(row.plan_json)
+            session.add_all(
+                plan_analytics_rows(row.id, row.paycheck_date, plan.get("allocations", []), plan.get("checks", {}))
+            )
+            done += 1
+        session.commit()
+        last_id = batch[-1].id
+        if progress is not None:
+            progress(done)
+
+
+def plan_stats(
+    session: Session,
+    start: date | None = None,
+    end: date | None = None,
+    period: str = "month",
+) -> dict[str, object]:
+    """Allocation totals per period and bucket, and check pass counts, for paychecks in [start, end)."""
+    if period not in STATS_PERIODS:
+        raise ValueError(f"period must be one of {', '.join(STATS_PERIODS)}")
+    width = STATS_PERIODS[period]
+
+    alloc_period = func.substr(PlanAllocation.paycheck_date, 1, width).label("period")
+    alloc_query = select(
+        alloc_period,
+        PlanAllocation.bucket,
+        func.sum(PlanAllocation.amount_cents).label("total_cents"),
+        func.count(func.distinct(PlanAllocation.plan_id)).label("plans"),
+    )
+    check_period = func.substr(PlanCheck.paycheck_date, 1, width).label("period")
+    check_query = select(
+        check_period,
+        PlanCheck.name,
+        func.sum(cast(PlanCheck.passed, Integer)).label("passed"),
+        func.count().label("total"),
+    )
+    if start is not None:
+        alloc_query = alloc_query.where(PlanAllocation.paycheck_date >= start.isoformat())
+        check_query = check_query.where(PlanCheck.paycheck_date >= start.isoformat())
+    if end is not None:
+        alloc_query = alloc_query.where(PlanAllocation.paycheck_date < end.isoformat())
+        check_query = check_query.where(PlanCheck.paycheck_date < end.isoformat())
+
+    allocations = session.execute(
+        alloc_query.group_by(alloc_period, PlanAllocation.bucket).order_by(alloc_period, PlanAllocation.bucket)
+    ).all()
+    checks = session.execute(
+        check_query.group_by(check_period, PlanCheck.name).order_by(check_period, PlanCheck.name)
+    ).all()
+
+    return {
+        "start": start.isoformat() if start else None,
+        "end": end.isoformat() if end else None,
+        "period": period,
+        "allocations": [
+            {"period": row.period, "bucket": row.bucket, "total": str(from_cents(row.total_cents)), "plans": row.plans}
+            for row in allocations
+        ],
+        "checks": [
+            {"period": row.period, "name": row.name, "passed": int(row.passed or 0), "total": row.total}
+            for row in checks
+        ],
+    }
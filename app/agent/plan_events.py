@@ -0,0 +1,74 @@
+"""In-process fan-out of newly stored plan summaries to streaming subscribers."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Delivered in place of events once a subscriber falls behind and its queue overflows.
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    """One consumer's bounded event queue, owned by the event loop it was created on."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[dict[str, object]] = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def _offer(self, event: dict[str, object]) -> None:
+        # Runs on the subscriber's loop thread.
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: never block publishers or buffer without bound. Drop what is
+            # queued and tell the consumer to resync from GET /plans instead.
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self) -> dict[str, object]:
+        return await self.queue.get()
+
+
+class PlanBroadcaster:
+    """Thread-safe publisher; ``publish`` may be called from worker threads running sync handlers."""
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: set[Subscription] = set()
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        """Register a subscriber on the running event loop."""
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event: dict[str, object]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+            except RuntimeError:
+                # The subscriber's loop has closed without unsubscribing.
+                self.unsubscribe(subscription)
+
+
+plan_broadcaster = PlanBroadcaster()
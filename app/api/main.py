@@ -1,22 +1,76 @@
 """FastAPI app for Finance Co-Pilot v1."""
 
-from fastapi import Depends, FastAPI, HTTPException
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from datetime import date
+from typing import Literal
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.agent.payday_agent import generate_payday_plan, get_plan_run, list_plan_runs
+from app.agent.fx import MissingFxRateError, store_fx_rates
+from app.agent.idempotency import (
+    IdempotencyKeyConflict,
+    IdempotencyKeyTimeout,
+    request_fingerprint,
+    run_idempotent,
+)
+from app.agent.ledger import UnknownAccountError, post_transactions
+from app.agent.payday_agent import (
+    generate_payday_plan,
+    get_allocation_rules,
+    get_plan_etag,
+    get_plan_run,
+    list_plan_runs,
+    plan_list_etag,
+    set_allocation_rules,
+)
+from app.agent.plan_analytics import plan_stats
+from app.agent.plan_events import RESYNC, plan_broadcaster
 from app.api.schemas import (
+    AllocationRulesRequest,
+    AllocationRulesResponse,
+    FxRatesRequest,
+    FxRatesResponse,
     GenericStatus,
+    JobResponse,
+    JobSubmitRequest,
+    LedgerPostRequest,
+    LedgerPostResponse,
     PaydayPlanRequest,
     PaydayPlanResponse,
     PlanRunDetailResponse,
+    PlanRunListItem,
     PlanRunListResponse,
+    PlanStatsResponse,
 )
+from app.calculators.waterfall import InvalidAllocationRules
 from app.db.init_db import init_db
 from app.db.seed import seed_demo_data
 from app.db.session import SessionLocal
+from app.domain.models import Transaction
+from app.jobs import handlers as _job_handlers  # noqa: F401  (registers built-in job kinds)
+from app.jobs.queue import (
+    InvalidJobPayload,
+    JobWorkerPool,
+    UnknownJobKind,
+    cancel_job,
+    get_job,
+    job_to_dict,
+    submit_job,
+)
 
 app = FastAPI(title="Finance Co-Pilot", version="1.1.0")
 
+# Stored plans never change, so clients may cache them indefinitely; the list must be revalidated.
+PLAN_CACHE_CONTROL = "private, max-age=31536000, immutable"
+PLAN_LIST_CACHE_CONTROL = "private, no-cache"
+STREAM_KEEPALIVE_SECONDS = 15.0
+
+job_pool = JobWorkerPool(SessionLocal, workers=int(os.environ.get("FINANCE_COPILOT_JOB_WORKERS", "2")))
+
 
 def get_db() -> Session:
     db = SessionLocal()
@@ -26,9 +80,29 @@ def get_db() -> Session:
         db.close()
 
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/").strip('"') for tag in header.split(",")}
+    return etag in candidates
+
+
+def _not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": f'"{etag}"', "Cache-Control": cache_control})
+
+
 @app.on_event("startup")
 def on_startup() -> None:
     init_db()
+    job_pool.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    job_pool.stop()
 
 
 @app.post("/seed/demo", response_model=GenericStatus)
@@ -38,26 +112,176 @@ def seed_demo(db: Session = Depends(get_db)) -> GenericStatus:
 
 
 @app.post("/plan/payday", response_model=PaydayPlanResponse)
-def payday_plan(payload: PaydayPlanRequest, db: Session = Depends(get_db)) -> PaydayPlanResponse:
-    result = generate_payday_plan(
-        session=db,
-        paycheck_amount=payload.paycheck_amount,
-        paycheck_date=payload.paycheck_date,
-        override_buffer_amount=payload.override_buffer_amount,
-        next_paycheck_date=payload.next_paycheck_date,
-        use_income_schedule=payload.use_income_schedule,
-    )
+def payday_plan(
+    payload: PaydayPlanRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(default=None, max_length=255),
+) -> PaydayPlanResponse:
+    def run() -> dict[str, object]:
+        return generate_payday_plan(
+            session=db,
+            paycheck_amount=payload.paycheck_amount,
+            paycheck_date=payload.paycheck_date,
+            override_buffer_amount=payload.override_buffer_amount,
+            next_paycheck_date=payload.next_paycheck_date,
+            use_income_schedule=payload.use_income_schedule,
+            include_timeline=payload.include_timeline,
+            idempotency_key=idempotency_key,
+        )
+
+    try:
+        if idempotency_key is None:
+            result = run()
+        else:
+            fingerprint = request_fingerprint(payload.model_dump(mode="json"))
+            try:
+                result, replayed = run_idempotent(db, idempotency_key, fingerprint, run)
+            except IdempotencyKeyConflict as exc:
+                raise HTTPException(status_code=422, detail=str(exc)) from exc
+            except IdempotencyKeyTimeout as exc:
+                raise HTTPException(status_code=409, detail=str(exc)) from exc
+            if replayed:
+                response.headers["Idempotent-Replayed"] = "true"
+    except MissingFxRateError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
     return PaydayPlanResponse.model_validate(result)
 
 
+@app.get("/preferences/allocation-rules", response_model=AllocationRulesResponse)
+def allocation_rules(db: Session = Depends(get_db)) -> AllocationRulesResponse:
+    return AllocationRulesResponse.model_validate(get_allocation_rules(db))
+
+
+@app.put("/preferences/allocation-rules", response_model=AllocationRulesResponse)
+def update_allocation_rules(payload: AllocationRulesRequest, db: Session = Depends(get_db)) -> AllocationRulesResponse:
+    rules = None
+    if payload.rules is not None:
+        rules = [rule.model_dump(mode="json", exclude_none=True) for rule in payload.rules]
+    try:
+        result = set_allocation_rules(db, rules)
+    except InvalidAllocationRules as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return AllocationRulesResponse.model_validate(result)
+
+
+@app.post("/fx/rates", response_model=FxRatesResponse)
+def fx_rates_store(payload: FxRatesRequest, db: Session = Depends(get_db)) -> FxRatesResponse:
+    stored = store_fx_rates(db, [rate.model_dump() for rate in payload.rates])
+    return FxRatesResponse(stored=stored)
+
+
+@app.post("/ledger/transactions", response_model=LedgerPostResponse)
+def ledger_post(payload: LedgerPostRequest, db: Session = Depends(get_db)) -> LedgerPostResponse:
+    transactions = [
+        Transaction(account_id=t.account_id, amount=t.amount, posted_on=t.posted_on, description=t.description)
+        for t in payload.transactions
+    ]
+    try:
+        balances = post_transactions(db, transactions)
+    except UnknownAccountError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return LedgerPostResponse(
+        posted=len(transactions),
+        balances={account_id: str(balance) for account_id, balance in balances.items()},
+    )
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+def jobs_submit(payload: JobSubmitRequest, db: Session = Depends(get_db)) -> JobResponse:
+    try:
+        job = submit_job(db, payload.kind, payload.payload, priority=payload.priority)
+    except (UnknownJobKind, InvalidJobPayload) as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    job_pool.notify()
+    return JobResponse.model_validate(job_to_dict(job))
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+def jobs_get(job_id: str, db: Session = Depends(get_db)) -> JobResponse:
+    job = get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse.model_validate(job_to_dict(job))
+
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+def jobs_cancel(job_id: str, db: Session = Depends(get_db)) -> JobResponse:
+    job = cancel_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse.model_validate(job_to_dict(job))
+
+
 @app.get("/plans", response_model=PlanRunListResponse)
-def plans(db: Session = Depends(get_db)) -> PlanRunListResponse:
+def plans(request: Request, response: Response, db: Session = Depends(get_db)) -> PlanRunListResponse:
+    etag = plan_list_etag(db)
+    if _etag_matches(request, etag):
+        return _not_modified(etag, PLAN_LIST_CACHE_CONTROL)
+    response.headers["ETag"] = f'"{etag}"'
+    response.headers["Cache-Control"] = PLAN_LIST_CACHE_CONTROL
     return PlanRunListResponse(plans=list_plan_runs(db))
 
 
+@app.get("/plans/stats", response_model=PlanStatsResponse)
+def plans_stats(
+    start: date | None = Query(default=None, description="First paycheck date included"),
+    end: date | None = Query(default=None, description="First paycheck date excluded"),
+    period: Literal["day", "month", "year"] = "month",
+    db: Session = Depends(get_db),
+) -> PlanStatsResponse:
+    return PlanStatsResponse.model_validate(plan_stats(db, start=start, end=end, period=period))
+
+
+@app.get("/plans/stream")
+async def plan_stream(request: Request) -> StreamingResponse:
+    """Server-Sent Events feed of newly stored plans, one ``plan`` event per ``GET /plans`` item.
+
+    A ``resync`` event means this subscriber fell behind and was dropped; reload ``GET /plans``
+    and reconnect.
+    """
+
+    async def events() -> AsyncIterator[str]:
+        # Subscribed only once the body is actually streamed, so a client that disconnects before
+        # the first chunk never leaves a subscription behind.
+        subscription = plan_broadcaster.subscribe()
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if event is RESYNC:
+                    yield "event: resync\ndata: {}\n\n"
+                    break
+                item = PlanRunListItem.model_validate(event)
+                yield f"event: plan\nid: {item.plan_id}\ndata: {item.model_dump_json()}\n\n"
+        finally:
+            plan_broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/plans/{plan_id}", response_model=PlanRunDetailResponse)
-def plan_by_id(plan_id: str, db: Session = Depends(get_db)) -> PlanRunDetailResponse:
+def plan_by_id(
+    plan_id: str, request: Request, response: Response, db: Session = Depends(get_db)
+) -> PlanRunDetailResponse:
+    etag = get_plan_etag(db, plan_id)
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    if _etag_matches(request, etag):
+        return _not_modified(etag, PLAN_CACHE_CONTROL)
     plan = get_plan_run(db, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
+    response.headers["ETag"] = f'"{etag}"'
+    response.headers["Cache-Control"] = PLAN_CACHE_CONTROL
     return PlanRunDetailResponse.model_validate(plan)
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from datetime import date
 from decimal import Decimal
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
@@ -14,6 +15,7 @@ class PaydayPlanRequest(BaseModel):
     override_buffer_amount: Decimal | None = Field(default=None, ge=0)
     next_paycheck_date: date | None = None
     use_income_schedule: bool = True
+    include_timeline: bool = False
 
 
 class Allocation(BaseModel):
@@ -39,6 +41,7 @@ class PaydayPlanResponse(BaseModel):
     primary_surplus_target: str
     details: dict[str, object]
     inputs: dict[str, object]
+    timeline: dict[str, object] | None = None
 
 
 class GenericStatus(BaseModel):
@@ -64,3 +67,93 @@ class PlanRunDetailResponse(BaseModel):
     paycheck_amount: str | None
     checks_summary: str | None
     plan: dict[str, object] | None
+
+
+class LedgerTransaction(BaseModel):
+    account_id: int
+    amount: Decimal
+    posted_on: date
+    description: str | None = Field(default=None, max_length=200)
+
+
+class LedgerPostRequest(BaseModel):
+    transactions: list[LedgerTransaction] = Field(..., min_length=1)
+
+
+class LedgerPostResponse(BaseModel):
+    posted: int
+    balances: dict[int, str]
+
+
+class FxRateIn(BaseModel):
+    base_currency: str = Field(..., min_length=3, max_length=8)
+    quote_currency: str = Field(..., min_length=3, max_length=8)
+    effective_date: date
+    # Units of quote_currency per one unit of base_currency.
+    rate: Decimal = Field(..., gt=0)
+
+
+class FxRatesRequest(BaseModel):
+    rates: list[FxRateIn] = Field(..., min_length=1)
+
+
+class FxRatesResponse(BaseModel):
+    stored: int
+
+
+class PlanAllocationStat(BaseModel):
+    period: str
+    bucket: str
+    total: str
+    plans: int
+
+
+class PlanCheckStat(BaseModel):
+    period: str
+    name: str
+    passed: int
+    total: int
+
+
+class PlanStatsResponse(BaseModel):
+    start: str | None
+    end: str | None
+    period: str
+    allocations: list[PlanAllocationStat]
+    checks: list[PlanCheckStat]
+
+
+class AllocationRule(BaseModel):
+    bucket: str = Field(..., min_length=1, max_length=40)
+    source: Literal["bills", "buffer", "debt_minimums", "safe_to_invest", "percent", "target", "remainder"]
+    value: Decimal | None = Field(default=None, ge=0)
+    cap: Decimal | None = Field(default=None, ge=0)
+
+
+class AllocationRulesRequest(BaseModel):
+    rules: list[AllocationRule] | None
+
+
+class AllocationRulesResponse(BaseModel):
+    version: int
+    rules: list[AllocationRule] | None
+
+
+class JobSubmitRequest(BaseModel):
+    kind: str
+    payload: dict[str, object] = Field(default_factory=dict)
+    priority: int = Field(default=0, ge=-100, le=100)
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    priority: int
+    progress: float
+    cancel_requested: bool
+    result: dict[str, object] | None
+    error: str | None
+    created_at: str
+    started_at: str | None
+    finished_at: str | None
@@ -5,7 +5,27 @@ from __future__ import annotations
 from datetime import date, timedelta
 from decimal import Decimal, ROUND_HALF_UP
 
+from app.calculators.waterfall import (
+    DEFAULT_WATERFALLS,
+    DISCRETIONARY_OPS,
+    OP_BILLS,
+    OP_BUFFER,
+    OP_DEBT_MINIMUMS,
+    OP_PERCENT,
+    OP_SAFE_TO_INVEST,
+    OP_TARGET,
+    Waterfall,
+)
 from app.domain.models import Bill, Debt
+from app.domain.tables import (
+    CADENCE_BIWEEKLY,
+    CADENCE_MONTHLY,
+    CADENCE_WEEKLY,
+    NONE_CODE,
+    BillTable,
+    DebtTable,
+    from_cents,
+)
 
 CENT = Decimal("0.01")
 
@@ -34,8 +54,13 @@ def count_weekly_occurrences(start: date, end: date, anchor_weekday: int) -> int
 
 
 def is_monthly_due(due_day: int | None, start: date, end: date) -> bool:
+    return first_monthly_due_date(due_day, start, end) is not None
+
+
+def first_monthly_due_date(due_day: int | None, start: date, end: date) -> date | None:
+    """First date in [start, end) a monthly bill falls due (clamped to short months), or None."""
     if due_day is None:
-        return False
+        return None
     current = start
     while current < end:
         month_end_day = 31
@@ -45,12 +70,12 @@ def is_monthly_due(due_day: int | None, start: date, end: date) -> bool:
             month_end_day = 29 if (current.year % 4 == 0 and (current.year % 100 != 0 or current.year % 400 == 0)) else 28
         candidate = date(current.year, current.month, min(due_day, month_end_day))
         if start <= candidate < end:
-            return True
+            return candidate
         if current.month == 12:
             current = date(current.year + 1, 1, 1)
         else:
             current = date(current.year, current.month + 1, 1)
-    return False
+    return None
 
 
 def due_amount(bill: Bill, start: date, end: date) -> Decimal:
@@ -66,16 +91,95 @@ def due_amount(bill: Bill, start: date, end: date) -> Decimal:
     return Decimal("0.00")
 
 
+def table_due_cents(table: BillTable, start: date, end: date) -> list[int]:
+    """Per-row amount due in [start, end), in cents; same rules as ``due_amount``.
+
+    Occurrence checks are memoized per distinct weekday anchor and due day, so large tables
+    with many bills sharing a schedule only evaluate each schedule once.
+    """
+    weekly_counts: dict[int, int] = {}
+    monthly_due: dict[int, bool] = {}
+    default_anchor = start.weekday()
+    out: list[int] = []
+    columns = zip(table.amount_cents, table.cadence_codes, table.due_days, table.weekday_anchors)
+    for cents, code, due_day, anchor in columns:
+        if code == CADENCE_WEEKLY:
+            anchor = anchor if anchor != NONE_CODE else default_anchor
+            occurrences = weekly_counts.get(anchor)
+            if occurrences is None:
+                occurrences = weekly_counts[anchor] = count_weekly_occurrences(start, end, anchor)
+            out.append(cents * occurrences)
+        elif code == CADENCE_BIWEEKLY:
+            out.append(cents)
+        elif code == CADENCE_MONTHLY and due_day != NONE_CODE:
+            is_due = monthly_due.get(due_day)
+            if is_due is None:
+                is_due = monthly_due[due_day] = is_monthly_due(due_day, start, end)
+            out.append(cents if is_due else 0)
+        else:
+            out.append(0)
+    return out
+
+
+def _due_bills(bills: list[Bill] | BillTable, start: date, end: date) -> list[tuple[int, str, str, Decimal]]:
+    """``(bill_id, name, cadence, amount_due)`` for bills due in [start, end), in funding order."""
+    if isinstance(bills, BillTable):
+        due_cents = table_due_cents(bills, start, end)
+        rows = [
+            (bills.due_days[i] if bills.due_days[i] > 0 else 99, bills.names[i], i)
+            for i, cents in enumerate(due_cents)
+            if cents > 0
+        ]
+        rows.sort(key=lambda row: (row[0], row[1]))
+        return [(bills.ids[i], name, bills.cadence(i), from_cents(due_cents[i])) for _, name, i in rows]
+
+    due_rows = []
+    for bill in sorted(bills, key=lambda b: ((b.due_day or 99), b.name)):
+        due = due_amount(bill, start, end)
+        if due > 0:
+            due_rows.append((bill.id, bill.name, bill.cadence, due))
+    return due_rows
+
+
+def _debt_min_total(debts: list[Debt] | DebtTable) -> Decimal:
+    if isinstance(debts, DebtTable):
+        return money(debts.min_payment_total())
+    return money(sum(money(d.min_payment) for d in debts))
+
+
+def _fund_bills(
+    due_rows: list[tuple[int, str, str, Decimal]], available: Decimal
+) -> tuple[list[dict[str, object]], Decimal]:
+    bill_details: list[dict[str, object]] = []
+    funded_bills = Decimal("0.00")
+    for bill_id, bill_name, cadence, due in due_rows:
+        funded = money(min(available, due))
+        available = money(available - funded)
+        funded_bills += funded
+        bill_details.append(
+            {
+                "bill_id": bill_id,
+                "bill_name": bill_name,
+                "cadence": cadence,
+                "amount_due": money(due),
+                "amount_funded": funded,
+                "fully_funded": funded + CENT >= due,
+            }
+        )
+    return bill_details, money(funded_bills)
+
+
 def compute_plan(
     paycheck_amount: Decimal,
     paycheck_date: date,
     period_end: date,
-    bills: list[Bill],
-    debts: list[Debt],
+    bills: list[Bill] | BillTable,
+    debts: list[Debt] | DebtTable,
     buffer_target: Decimal,
     min_cash_buffer: Decimal,
     primary_surplus_target: str,
     starting_liquid_cash: Decimal,
+    waterfall: Waterfall | None = None,
 ) -> dict[str, object]:
     paycheck_amount = money(paycheck_amount)
     buffer_target = money(buffer_target)
@@ -83,67 +187,60 @@ def compute_plan(
     starting_liquid_cash = money(starting_liquid_cash)
     primary_surplus_target = primary_surplus_target if primary_surplus_target in VALID_SURPLUS_TARGETS else "invest"
 
-    remaining = paycheck_amount
-    bill_details: list[dict[str, object]] = []
-    total_bills_due = Decimal("0.00")
-    funded_bills = Decimal("0.00")
-
-    ordered = sorted(bills, key=lambda b: ((b.due_day or 99), b.name))
-    for bill in ordered:
-        due = due_amount(bill, paycheck_date, period_end)
-        if due <= 0:
-            continue
-        total_bills_due += due
-        funded = money(min(remaining, due))
-        remaining = money(remaining - funded)
-        funded_bills += funded
-        bill_details.append(
-            {
-                "bill_id": bill.id,
-                "bill_name": bill.name,
-                "cadence": bill.cadence,
-                "amount_due": money(due),
-                "amount_funded": funded,
-                "fully_funded": funded + CENT >= due,
-            }
-        )
+    due_rows = _due_bills(bills, paycheck_date, period_end)
+    total_bills_due = money(sum((due for *_, due in due_rows), Decimal("0.00")))
+    debt_min_total = _debt_min_total(debts)
 
-    buffer_allocated = money(min(remaining, buffer_target))
-    remaining = money(remaining - buffer_allocated)
+    projected_end_cash = money(starting_liquid_cash + paycheck_amount - total_bills_due - buffer_target - debt_min_total)
+    safe_to_invest = money(max(Decimal("0.00"), projected_end_cash - min_cash_buffer))
 
-    debt_min_total = money(sum(money(d.min_payment) for d in debts))
-    debt_min_allocated = money(min(remaining, debt_min_total))
-    remaining = money(remaining - debt_min_allocated)
+    if waterfall is None:
+        waterfall = DEFAULT_WATERFALLS[primary_surplus_target]
 
-    projected_end_cash = money(starting_liquid_cash + paycheck_amount - money(total_bills_due) - buffer_target - debt_min_total)
-    safe_to_invest = money(max(Decimal("0.00"), projected_end_cash - min_cash_buffer))
+    remaining = paycheck_amount
+    # Safe-to-invest is one budget shared by every discretionary step: safe_to_invest rules draw
+    # from what is left of it, and percent/target rules ahead of them use it up first.
+    safe_budget = safe_to_invest
+    discretionary = Decimal("0.00")
+    bill_details: list[dict[str, object]] | None = None
+    funded_bills = Decimal("0.00")
+    buffer_allocated = Decimal("0.00")
+    debt_min_allocated = Decimal("0.00")
+    allocations = []
+    for step in waterfall.steps:
+        available = remaining if step.cap is None else min(remaining, money(step.cap))
+        if step.op == OP_BILLS:
+            bill_details, funded_bills = _fund_bills(due_rows, available)
+            amount = funded_bills
+        elif step.op == OP_BUFFER:
+            amount = buffer_allocated = money(min(available, buffer_target))
+        elif step.op == OP_DEBT_MINIMUMS:
+            amount = debt_min_allocated = money(min(available, debt_min_total))
+        elif step.op == OP_SAFE_TO_INVEST:
+            amount = money(min(available, safe_budget))
+        elif step.op == OP_PERCENT:
+            amount = money(min(available, paycheck_amount * step.value / 100))
+        elif step.op == OP_TARGET:
+            amount = money(min(available, step.value))
+        else:
+            amount = available
+        if step.op in DISCRETIONARY_OPS:
+            discretionary += amount
+            safe_budget = money(max(Decimal("0.00"), safe_budget - amount))
+        remaining = money(remaining - amount)
+        allocations.append({"bucket": step.bucket, "amount": money(amount)})
 
-    target_alloc = Decimal("0.00")
-    target_bucket = None
-    if primary_surplus_target == "invest":
-        target_bucket = "Invest"
-        target_alloc = money(min(remaining, safe_to_invest))
-    elif primary_surplus_target == "emergency_fund":
-        target_bucket = "EmergencyFundTopUp"
-        target_alloc = money(min(remaining, safe_to_invest))
-
-    extra_debt = remaining
-    allocations = [
-        {"bucket": "Bills", "amount": money(funded_bills)},
-        {"bucket": "Spending", "amount": buffer_allocated},
-        {"bucket": "DebtMinimum", "amount": debt_min_allocated},
-    ]
-    if target_bucket:
-        allocations.append({"bucket": target_bucket, "amount": target_alloc})
-        extra_debt = money(remaining - target_alloc)
-    allocations.append({"bucket": "ExtraDebt", "amount": money(extra_debt)})
+    if bill_details is None:
+        # No bills step in this waterfall: report every due bill as unfunded.
+        bill_details, funded_bills = _fund_bills(due_rows, Decimal("0.00"))
 
     alloc_sum = money(sum(a["amount"] for a in allocations))
     checks = {
         "allocations_sum_ok": abs(alloc_sum - paycheck_amount) <= CENT,
-        "bills_covered_ok": money(funded_bills) + CENT >= money(total_bills_due),
+        "bills_covered_ok": money(funded_bills) + CENT >= total_bills_due,
         "buffer_met_ok": buffer_allocated + CENT >= buffer_target,
-        "min_cash_buffer_met_ok": projected_end_cash + CENT >= min_cash_buffer,
+        "min_cash_buffer_met_ok": projected_end_cash + CENT >= min_cash_buffer
+        and discretionary <= safe_to_invest + CENT,
     }
 
     unfunded = []
@@ -165,7 +262,7 @@ def compute_plan(
         "projected_end_cash": projected_end_cash,
         "primary_surplus_target": primary_surplus_target,
         "details": {
-            "bills_due_total": money(total_bills_due),
+            "bills_due_total": total_bills_due,
             "debt_min_total": debt_min_total,
             "min_cash_buffer": min_cash_buffer,
             "starting_liquid_cash": starting_liquid_cash,
@@ -0,0 +1,94 @@
+"""Intra-period daily cashflow timeline with lowest-balance and overdraft detection."""
+
+from __future__ import annotations
+
+from array import array
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from app.calculators.payday import first_monthly_due_date
+from app.domain.models import Bill
+from app.domain.tables import (
+    CADENCE_BIWEEKLY,
+    CADENCE_MONTHLY,
+    CADENCE_WEEKLY,
+    NONE_CODE,
+    BillTable,
+    from_cents,
+    to_cents,
+)
+
+
+def _bill_outflows(table: BillTable, start: date, days: int) -> array:
+    """Per-day bill outflows in cents, placing each charge on the date ``due_amount`` counts it.
+
+    Weekly bills land on every anchor weekday, monthly bills on their (clamped) due date, and
+    biweekly bills, which are charged once per period, on the first day of the period.
+    """
+    end = start + timedelta(days=days)
+    outflows = array("q", bytes(8 * days))
+    weekly_offsets: dict[int, range] = {}
+    monthly_offsets: dict[int, int | None] = {}
+    columns = zip(table.amount_cents, table.cadence_codes, table.due_days, table.weekday_anchors)
+    for cents, code, due_day, anchor in columns:
+        if code == CADENCE_WEEKLY:
+            anchor = anchor if anchor != NONE_CODE else start.weekday()
+            offsets = weekly_offsets.get(anchor)
+            if offsets is None:
+                offsets = weekly_offsets[anchor] = range((anchor - start.weekday()) % 7, days, 7)
+            for offset in offsets:
+                outflows[offset] += cents
+        elif code == CADENCE_BIWEEKLY:
+            outflows[0] += cents
+        elif code == CADENCE_MONTHLY and due_day != NONE_CODE:
+            if due_day not in monthly_offsets:
+                due = first_monthly_due_date(due_day, start, end)
+                monthly_offsets[due_day] = (due - start).days if due is not None else None
+            offset = monthly_offsets[due_day]
+            if offset is not None:
+                outflows[offset] += cents
+    return outflows
+
+
+def compute_timeline(
+    bills: list[Bill] | BillTable,
+    paycheck_amount: Decimal,
+    paycheck_date: date,
+    period_end: date,
+    starting_liquid_cash: Decimal,
+) -> dict[str, object]:
+    """Running end-of-day balance for each day in [paycheck_date, period_end).
+
+    The paycheck lands on ``paycheck_date`` before that day's bills. Debt minimums and the
+    spending buffer have no due dates, so only bills are placed on the timeline. An empty period
+    gets an empty timeline, matching the plan, which counts no bills due in it.
+    """
+    days = (period_end - paycheck_date).days
+    if days <= 0:
+        return {"days": [], "min_balance": None, "min_balance_date": None, "overdraft_days": [], "end_balance": None}
+    table = bills if isinstance(bills, BillTable) else BillTable.from_bills(bills)
+    outflows = _bill_outflows(table, paycheck_date, days)
+    inflows = array("q", bytes(8 * days))
+    inflows[0] = to_cents(paycheck_amount)
+
+    net = (inflow - outflow for inflow, outflow in zip(inflows, outflows))
+    balances = list(accumulate(net, initial=to_cents(starting_liquid_cash)))[1:]
+    min_index = min(range(days), key=balances.__getitem__)
+    dates = [paycheck_date + timedelta(days=offset) for offset in range(days)]
+
+    return {
+        "days": [
+            {
+                "date": dates[i].isoformat(),
+                "inflow": str(from_cents(inflows[i])),
+                "outflow": str(from_cents(outflows[i])),
+                "balance": str(from_cents(balances[i])),
+            }
+            for i in range(days)
+        ],
+        "min_balance": str(from_cents(balances[min_index])),
+        "min_balance_date": dates[min_index].isoformat(),
+        "overdraft_days": [dates[i].isoformat() for i in range(days) if balances[i] < 0],
+        "end_balance": str(from_cents(balances[-1])),
+    }
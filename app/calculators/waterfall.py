@@ -0,0 +1,155 @@
+"""Declarative allocation waterfalls compiled into flat step sequences.
+
+A rule list such as::
+
+    [
+        {"bucket": "Bills", "source": "bills"},
+        {"bucket": "Spending", "source": "buffer", "cap": "400.00"},
+        {"bucket": "Invest", "source": "percent", "value": 10},
+        {"bucket": "Vacation", "source": "target", "value": "150.00"},
+        {"bucket": "ExtraDebt", "source": "remainder"},
+    ]
+
+is validated once and compiled to a tuple of ``WaterfallStep`` records that ``compute_plan``
+executes in order, each taking at most what is still unallocated (and at most its ``cap``).
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+OP_BILLS = 1
+OP_BUFFER = 2
+OP_DEBT_MINIMUMS = 3
+OP_SAFE_TO_INVEST = 4
+OP_PERCENT = 5
+OP_TARGET = 6
+OP_REMAINDER = 7
+
+SOURCES = {
+    "bills": OP_BILLS,
+    "buffer": OP_BUFFER,
+    "debt_minimums": OP_DEBT_MINIMUMS,
+    "safe_to_invest": OP_SAFE_TO_INVEST,
+    "percent": OP_PERCENT,
+    "target": OP_TARGET,
+    "remainder": OP_REMAINDER,
+}
+# Sources the plan checks refer to; each may appear at most once.
+SINGLE_USE_SOURCES = {"bills", "buffer", "debt_minimums"}
+# Steps that spend out of the shared safe-to-invest budget rather than a fixed obligation.
+DISCRETIONARY_OPS = frozenset({OP_SAFE_TO_INVEST, OP_PERCENT, OP_TARGET})
+COMPILED_CACHE_SIZE = 256
+
+
+class InvalidAllocationRules(ValueError):
+    """The allocation rule list failed validation."""
+
+
+@dataclass(frozen=True, slots=True)
+class WaterfallStep:
+    op: int
+    bucket: str
+    value: Decimal | None = None
+    cap: Decimal | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class Waterfall:
+    steps: tuple[WaterfallStep, ...]
+
+
+def _decimal(rule_index: int, field_name: str, raw: object) -> Decimal:
+    try:
+        value = Decimal(str(raw))
+    except InvalidOperation as exc:
+        raise InvalidAllocationRules(f"rule {rule_index}: {field_name} must be a number") from exc
+    if not value.is_finite() or value < 0:
+        raise InvalidAllocationRules(f"rule {rule_index}: {field_name} must be a non-negative number")
+    return value
+
+
+def compile_rules(rules: Sequence[Mapping[str, object]]) -> Waterfall:
+    """Validate ``rules`` and compile them; raises ``InvalidAllocationRules``."""
+    if not rules:
+        raise InvalidAllocationRules("at least one rule is required")
+
+    steps: list[WaterfallStep] = []
+    buckets: set[str] = set()
+    used_sources: set[str] = set()
+    for index, rule in enumerate(rules):
+        bucket = str(rule.get("bucket") or "").strip()
+        source = rule.get("source")
+        if not bucket:
+            raise InvalidAllocationRules(f"rule {index}: bucket is required")
+        if bucket in buckets:
+            raise InvalidAllocationRules(f"rule {index}: duplicate bucket {bucket!r}")
+        if source not in SOURCES:
+            raise InvalidAllocationRules(f"rule {index}: source must be one of {', '.join(SOURCES)}")
+        if source in SINGLE_USE_SOURCES and source in used_sources:
+            raise InvalidAllocationRules(f"rule {index}: source {source!r} may only be used once")
+        if source == "remainder" and index != len(rules) - 1:
+            raise InvalidAllocationRules(f"rule {index}: remainder must be the last rule")
+
+        value = None
+        if source in {"percent", "target"}:
+            if rule.get("value") is None:
+                raise InvalidAllocationRules(f"rule {index}: {source} requires a value")
+            value = _decimal(index, "value", rule["value"])
+            if source == "percent" and value > 100:
+                raise InvalidAllocationRules(f"rule {index}: percent must be between 0 and 100")
+        if source == "remainder" and rule.get("cap") is not None:
+            raise InvalidAllocationRules(f"rule {index}: remainder cannot take a cap; it allocates the rest of the paycheck")
+        cap = _decimal(index, "cap", rule["cap"]) if rule.get("cap") is not None else None
+
+        buckets.add(bucket)
+        used_sources.add(source)
+        steps.append(WaterfallStep(op=SOURCES[source], bucket=bucket, value=value, cap=cap))
+
+    if steps[-1].op != OP_REMAINDER:
+        raise InvalidAllocationRules("the last rule must use the remainder source so the paycheck is fully allocated")
+    return Waterfall(steps=tuple(steps))
+
+
+def _default_rules(primary_surplus_target: str) -> list[dict[str, object]]:
+    rules: list[dict[str, object]] = [
+        {"bucket": "Bills", "source": "bills"},
+        {"bucket": "Spending", "source": "buffer"},
+        {"bucket": "DebtMinimum", "source": "debt_minimums"},
+    ]
+    if primary_surplus_target == "invest":
+        rules.append({"bucket": "Invest", "source": "safe_to_invest"})
+    elif primary_surplus_target == "emergency_fund":
+        rules.append({"bucket": "EmergencyFundTopUp", "source": "safe_to_invest"})
+    rules.append({"bucket": "ExtraDebt", "source": "remainder"})
+    return rules
+
+
+DEFAULT_WATERFALLS = {
+    target: compile_rules(_default_rules(target)) for target in ("invest", "extra_debt", "emergency_fund")
+}
+
+_compiled: dict[tuple[int, int], Waterfall] = {}
+_compiled_lock = threading.Lock()
+
+
+def waterfall_for_profile(profile_id: int, rules_version: int, rules_json: str) -> Waterfall:
+    """Compiled waterfall for a profile, cached by ``(profile_id, rules_version)``.
+
+    Bumping the version whenever the rules change makes stale entries unreachable, so only the
+    first request after an update pays for parsing and validation.
+    """
+    key = (profile_id, rules_version)
+    waterfall = _compiled.get(key)
+    if waterfall is not None:
+        return waterfall
+    waterfall = compile_rules(json.loads(rules_json))
+    with _compiled_lock:
+        if len(_compiled) >= COMPILED_CACHE_SIZE:
+            _compiled.clear()
+        _compiled[key] = waterfall
+    return waterfall
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from datetime import date
 from decimal import Decimal
 
@@ -11,6 +12,8 @@ from app.agent.payday_agent import generate_payday_plan
 from app.db.init_db import init_db
 from app.db.seed import seed_demo_data
 from app.db.session import SessionLocal
+from app.db.synthetic import generate_synthetic_profile
+from app.loadtest import LoadTestConfig, parse_mix, run_load_test
 
 
 def run_demo(amount: Decimal, paycheck_date: date, next_paycheck_date: date | None = None) -> None:
@@ -26,6 +29,15 @@ def run_demo(amount: Decimal, paycheck_date: date, next_paycheck_date: date | No
     print(json.dumps(plan, indent=2))
 
 
+def run_synthetic(**options: int) -> None:
+    init_db()
+    with SessionLocal() as session:
+        counts = generate_synthetic_profile(
+            session, progress=lambda n: print(f"plan_runs written: {n}", file=sys.stderr), **options
+        )
+    print(json.dumps(counts, indent=2))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Finance Co-Pilot CLI")
     sub = parser.add_subparsers(dest="command", required=True)
@@ -35,11 +47,50 @@ def main() -> None:
     demo.add_argument("--date", default=date.today().isoformat(), help="YYYY-MM-DD")
     demo.add_argument("--next-paycheck-date", default=None, help="Optional YYYY-MM-DD period end")
 
+    synth = sub.add_parser("synth-profile", help="Bulk-generate a deterministic synthetic profile")
+    synth.add_argument("--seed", type=int, default=0)
+    synth.add_argument("--accounts", type=int, default=5)
+    synth.add_argument("--bills", type=int, default=200)
+    synth.add_argument("--debts", type=int, default=10)
+    synth.add_argument("--plan-runs", type=int, default=100_000)
+    synth.add_argument("--batch-size", type=int, default=10_000)
+
+    load = sub.add_parser("loadtest", help="Drive the API against a disposable database and report latency")
+    load.add_argument("--requests", type=int, default=500)
+    load.add_argument("--concurrency", type=int, default=8)
+    load.add_argument("--rate", type=float, default=None, help="Target requests/second (default: unthrottled)")
+    load.add_argument("--mix", default="plan=1,list=3,get=6", help="Operation weights, e.g. plan=1,list=3,get=6")
+    load.add_argument("--target", choices=["inprocess", "uvicorn"], default="inprocess")
+    load.add_argument("--seed", type=int, default=0)
+    load.add_argument("--profile-bills", type=int, default=200)
+    load.add_argument("--history-plans", type=int, default=1_000)
+
     args = parser.parse_args()
 
     if args.command == "demo-payday":
         next_pay = date.fromisoformat(args.next_paycheck_date) if args.next_paycheck_date else None
         run_demo(args.amount, date.fromisoformat(args.date), next_paycheck_date=next_pay)
+    elif args.command == "synth-profile":
+        run_synthetic(
+            seed=args.seed,
+            accounts=args.accounts,
+            bills=args.bills,
+            debts=args.debts,
+            plan_runs=args.plan_runs,
+            batch_size=args.batch_size,
+        )
+    elif args.command == "loadtest":
+        config = LoadTestConfig(
+            requests=args.requests,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            mix=parse_mix(args.mix),
+            target=args.target,
+            seed=args.seed,
+            profile_bills=args.profile_bills,
+            history_plans=args.history_plans,
+        )
+        print(json.dumps(run_load_test(config), indent=2))
 
 
 if __name__ == "__main__":
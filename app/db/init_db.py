@@ -1,31 +1,44 @@
 """Create local SQLite schema and apply lightweight dev migrations."""
 
-from sqlalchemy import inspect, text
+from sqlalchemy import Engine, inspect, text
 
 from app.db.models import Base
 from app.db.session import engine
 
 
-def _add_column_if_missing(table_name: str, column_name: str, ddl: str) -> None:
-    inspector = inspect(engine)
+def _add_column_if_missing(bind: Engine, table_name: str, column_name: str, ddl: str) -> None:
+    inspector = inspect(bind)
     columns = {col["name"] for col in inspector.get_columns(table_name)} if inspector.has_table(table_name) else set()
     if column_name in columns:
         return
-    with engine.begin() as conn:
+    with bind.begin() as conn:
         conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {ddl}"))
 
 
-def init_db() -> None:
-    Base.metadata.create_all(bind=engine)
+def _add_index_if_missing(bind: Engine, index_name: str, table_name: str, columns: str) -> None:
+    with bind.begin() as conn:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns})"))
+
+
+def init_db(bind: Engine | None = None) -> None:
+    bind = bind if bind is not None else engine
+    Base.metadata.create_all(bind=bind)
     # Lightweight dev migration strategy for sqlite: ALTER table to add newly required columns.
-    _add_column_if_missing("plan_runs", "paycheck_date", "paycheck_date VARCHAR(10)")
-    _add_column_if_missing("plan_runs", "paycheck_amount", "paycheck_amount NUMERIC(12,2)")
-    _add_column_if_missing("plan_runs", "checks_summary", "checks_summary TEXT")
-    _add_column_if_missing("plan_runs", "plan_json", "plan_json TEXT")
-
-    _add_column_if_missing("preferences", "min_cash_buffer", "min_cash_buffer NUMERIC(12,2) DEFAULT 2000.00")
-    _add_column_if_missing("preferences", "primary_surplus_target", "primary_surplus_target VARCHAR(30) DEFAULT 'invest'")
-    _add_column_if_missing("bills", "weekday_anchor", "weekday_anchor INTEGER")
+    _add_column_if_missing(bind, "plan_runs", "paycheck_date", "paycheck_date VARCHAR(10)")
+    _add_column_if_missing(bind, "plan_runs", "paycheck_amount", "paycheck_amount NUMERIC(12,2)")
+    _add_column_if_missing(bind, "plan_runs", "checks_summary", "checks_summary TEXT")
+    _add_column_if_missing(bind, "plan_runs", "plan_json", "plan_json TEXT")
+    _add_column_if_missing(bind, "plan_runs", "etag", "etag VARCHAR(64)")
+    _add_index_if_missing(bind, "ix_plan_runs_created_at_id", "plan_runs", "created_at, id")
+    _add_index_if_missing(bind, "ix_plan_runs_id_etag", "plan_runs", "id, etag")
+
+    _add_column_if_missing(bind, "preferences", "min_cash_buffer", "min_cash_buffer NUMERIC(12,2) DEFAULT 2000.00")
+    _add_column_if_missing(bind, "preferences", "primary_surplus_target", "primary_surplus_target VARCHAR(30) DEFAULT 'invest'")
+    _add_column_if_missing(bind, "preferences", "allocation_rules", "allocation_rules TEXT")
+    _add_column_if_missing(bind, "preferences", "allocation_rules_version", "allocation_rules_version INTEGER DEFAULT 0")
+    _add_column_if_missing(bind, "bills", "weekday_anchor", "weekday_anchor INTEGER")
+    _add_index_if_missing(bind, "ix_accounts_type", "accounts", "type")
+    _add_column_if_missing(bind, "jobs", "heartbeat_at", "heartbeat_at DATETIME")
 
 
 if __name__ == "__main__":
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, Numeric, String, Text
+import hashlib
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, Integer, Numeric, String, Text
 from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, Text, Boolean
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.sql import func
@@ -14,6 +17,7 @@ class Base(DeclarativeBase):
 
 class Account(Base):
     __tablename__ = "accounts"
+    __table_args__ = (Index("ix_accounts_type", "type"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(120), nullable=False)
@@ -22,6 +26,20 @@ class Account(Base):
     balance: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, default=0)
 
 
+class LedgerEntry(Base):
+    __tablename__ = "ledger_entries"
+    __table_args__ = (Index("ix_ledger_entries_account_posted", "account_id", "posted_on"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), nullable=False)
+    posted_on: Mapped[str] = mapped_column(String(10), nullable=False)
+    amount_cents: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Running account balance immediately after this entry; Account.balance holds the latest.
+    balance_after_cents: Mapped[int] = mapped_column(Integer, nullable=False)
+    description: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 class Bill(Base):
     __tablename__ = "bills"
 
@@ -55,6 +73,9 @@ class Preference(Base):
     primary_surplus_target: Mapped[str] = mapped_column(String(30), nullable=False, default="invest")
     currency: Mapped[str] = mapped_column(String(8), nullable=False, default="CAD")
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # JSON allocation rule list (see app.calculators.waterfall); None uses the default waterfall.
+    allocation_rules: Mapped[str | None] = mapped_column(Text, nullable=True)
+    allocation_rules_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
 
 class IncomeSchedule(Base):
@@ -67,8 +88,19 @@ class IncomeSchedule(Base):
     typical_net_amount: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
 
 
+def payload_etag(plan_json: str) -> str:
+    """Strong ETag stored in ``PlanRun.etag``: a digest of the serialized plan."""
+    return hashlib.sha256(plan_json.encode("utf-8")).hexdigest()[:32]
+
+
 class PlanRun(Base):
     __tablename__ = "plan_runs"
+    # Cover the history ordering and the per-plan ETag lookup so conditional requests are
+    # answered from an index alone, never reading the row (and its plan_json) itself.
+    __table_args__ = (
+        Index("ix_plan_runs_created_at_id", "created_at", "id"),
+        Index("ix_plan_runs_id_etag", "id", "etag"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -76,3 +108,72 @@ class PlanRun(Base):
     paycheck_amount: Mapped[float | None] = mapped_column(Numeric(12, 2), nullable=True)
     checks_summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     plan_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    etag: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    response_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+
+class PlanAllocation(Base):
+    __tablename__ = "plan_allocations"
+    # paycheck_date is copied from the plan run so date-range aggregates never join plan_runs.
+    __table_args__ = (Index("ix_plan_allocations_date_bucket", "paycheck_date", "bucket"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    plan_id: Mapped[str] = mapped_column(ForeignKey("plan_runs.id"), nullable=False, index=True)
+    paycheck_date: Mapped[str] = mapped_column(String(10), nullable=False)
+    bucket: Mapped[str] = mapped_column(String(40), nullable=False)
+    amount_cents: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class PlanCheck(Base):
+    __tablename__ = "plan_checks"
+    __table_args__ = (Index("ix_plan_checks_date_name", "paycheck_date", "name"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    plan_id: Mapped[str] = mapped_column(ForeignKey("plan_runs.id"), nullable=False, index=True)
+    paycheck_date: Mapped[str] = mapped_column(String(10), nullable=False)
+    name: Mapped[str] = mapped_column(String(40), nullable=False)
+    passed: Mapped[bool] = mapped_column(Boolean, nullable=False)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    # Serves the worker claim query: next queued job by priority, then age.
+    __table_args__ = (Index("ix_jobs_status_priority_created", "status", "priority", "created_at"),)
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(40), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    progress: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    payload_json: Mapped[str] = mapped_column(Text, nullable=False, default="{}")
+    result_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Refreshed while a worker runs the job; a stale heartbeat means the worker's process died.
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class FxRate(Base):
+    __tablename__ = "fx_rates"
+    # One rate per pair per day; also serves "latest rate on or before a date" lookups.
+    __table_args__ = (Index("ux_fx_rates_pair_date", "base_currency", "quote_currency", "effective_date", unique=True),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    base_currency: Mapped[str] = mapped_column(String(8), nullable=False)
+    quote_currency: Mapped[str] = mapped_column(String(8), nullable=False)
+    effective_date: Mapped[str] = mapped_column(String(10), nullable=False)
+    # Units of quote_currency per one unit of base_currency.
+    rate: Mapped[float] = mapped_column(Numeric(18, 8), nullable=False)
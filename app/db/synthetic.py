@@ -0,0 +1,183 @@
+"""Deterministic synthetic profiles at production-like volumes for scale testing."""
+
+from __future__ import annotations
+
+import json
+import random
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    Account,
+    Bill,
+    Debt,
+    IncomeSchedule,
+    PlanAllocation,
+    PlanCheck,
+    PlanRun,
+    Preference,
+    payload_etag,
+)
+
+CADENCES = ("weekly", "biweekly", "monthly")
+CADENCE_WEIGHTS = (0.25, 0.15, 0.60)
+ACCOUNT_TYPES = ("checking", "savings", "credit")
+CHECK_NAMES = ("allocations_sum_ok", "bills_covered_ok", "buffer_met_ok", "min_cash_buffer_met_ok")
+# Monthly bills cluster on the 1st and 15th, with a month-end tail over days 28-31 (which also
+# exercises the short-month clamping); every other day is equally likely.
+DUE_DAY_PEAKS = {1: 6, 15: 4, 28: 2, 29: 2, 30: 3, 31: 3}
+DUE_DAY_WEIGHTS = [DUE_DAY_PEAKS.get(day, 1) for day in range(1, 32)]
+
+
+def _cents(rng: random.Random, low: int, high: int) -> Decimal:
+    return Decimal(rng.randint(low, high)).scaleb(-2)
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(UUID(int=rng.getrandbits(128), version=4))
+
+
+def _bill_row(rng: random.Random, index: int, account_ids: list[int]) -> dict[str, object]:
+    # The first rows cover every cadence so even tiny profiles exercise each branch.
+    cadence = CADENCES[index] if index < len(CADENCES) else rng.choices(CADENCES, CADENCE_WEIGHTS)[0]
+    due_day = rng.choices(range(1, 32), DUE_DAY_WEIGHTS)[0] if cadence == "monthly" else None
+    weekday_anchor = None
+    if cadence == "weekly" and rng.random() < 0.8:
+        weekday_anchor = rng.choices(range(7), (2, 1, 1, 1, 2, 3, 2))[0]
+    return {
+        "name": f"{cadence.title()} bill {index + 1}",
+        "amount": _cents(rng, 500, 150_000 if cadence == "monthly" else 30_000),
+        "cadence": cadence,
+        "due_day": due_day,
+        "autopay": rng.random() < 0.7,
+        "pay_from_account_id": rng.choice(account_ids),
+        "weekday_anchor": weekday_anchor,
+    }
+
+
+def _plan_rows(
+    rng: random.Random, paycheck_date: date, created_at: datetime
+) -> tuple[dict[str, object], list[dict[str, object]], list[dict[str, object]]]:
+    plan_id = _uuid(rng)
+    paycheck_cents = rng.randint(150_000, 450_000)
+    parts = [rng.randint(0, paycheck_cents) for _ in range(4)]
+    bounds = sorted(parts)
+    split = [b - a for a, b in zip([0, *bounds], [*bounds, paycheck_cents])]
+    buckets = ("Bills", "Spending", "DebtMinimum", "Invest", "ExtraDebt")
+    checks = {name: rng.random() < 0.9 for name in CHECK_NAMES}
+    iso_date = paycheck_date.isoformat()
+    payload = {
+        "allocations": [{"bucket": b, "amount": str(Decimal(c).scaleb(-2))} for b, c in zip(buckets, split)],
+        "checks": checks,
+        "summary": "Synthetic plan.",
+        "inputs": {"paycheck_amount": str(Decimal(paycheck_cents).scaleb(-2)), "paycheck_date": iso_date},
+    }
+    plan_json = json.dumps(payload)
+    run = {
+        "id": plan_id,
+        "created_at": created_at,
+        "paycheck_date": iso_date,
+        "paycheck_amount": Decimal(paycheck_cents).scaleb(-2),
+        "checks_summary": ", ".join(f"{k}:{'ok' if v else 'fail'}" for k, v in checks.items()),
+        "plan_json": plan_json,
+        "etag": payload_etag(plan_json),
+    }
+    allocations = [
+        {"plan_id": plan_id, "paycheck_date": iso_date, "bucket": b, "amount_cents": c} for b, c in zip(buckets, split)
+    ]
+    check_rows = [{"plan_id": plan_id, "paycheck_date": iso_date, "name": k, "passed": v} for k, v in checks.items()]
+    return run, allocations, check_rows
+
+
+def generate_synthetic_profile(
+    session: Session,
+    seed: int = 0,
+    accounts: int = 5,
+    bills: int = 200,
+    debts: int = 10,
+    plan_runs: int = 100_000,
+    history_start: date = date(2021, 1, 4),
+    history_paydays: int = 130,
+    batch_size: int = 10_000,
+    progress: Callable[[int], None] | None = None,
+) -> dict[str, int]:
+    """Bulk-insert a seeded synthetic profile and plan history; the same seed yields the same data.
+
+    Plan runs are spread evenly over ``history_paydays`` biweekly paydays from ``history_start``
+    (many re-plans per payday at large volumes) and written with their normalized allocation
+    and check rows.
+    """
+    rng = random.Random(seed)
+
+    account_rows = [
+        {
+            "name": f"Account {i + 1}",
+            "type": ACCOUNT_TYPES[i] if i < len(ACCOUNT_TYPES) else rng.choice(ACCOUNT_TYPES),
+            "currency": "CAD",
+            "balance": _cents(rng, 0, 2_000_000),
+        }
+        for i in range(accounts)
+    ]
+    account_ids = list(session.scalars(insert(Account).returning(Account.id), account_rows)) if account_rows else []
+    if not account_ids:
+        account_ids = list(session.scalars(select(Account.id)))
+    if not account_ids:
+        raise ValueError("A synthetic profile needs at least one account")
+
+    bill_rows = [_bill_row(rng, i, account_ids) for i in range(bills)]
+    for start in range(0, len(bill_rows), batch_size):
+        session.execute(insert(Bill), bill_rows[start : start + batch_size])
+
+    debt_rows = [
+        {
+            "name": f"Debt {i + 1}",
+            "balance": _cents(rng, 50_000, 5_000_000),
+            "apr": Decimal(rng.randint(0, 29_990)).scaleb(-3),
+            "min_payment": _cents(rng, 2_500, 50_000),
+            "pay_from_account_id": rng.choice(account_ids),
+        }
+        for i in range(debts)
+    ]
+    if debt_rows:
+        session.execute(insert(Debt), debt_rows)
+
+    if session.scalar(select(func.count(Preference.id))) == 0:
+        session.add(Preference(currency="CAD", notes=f"synthetic profile (seed {seed})"))
+    if session.scalar(select(func.count(IncomeSchedule.id))) == 0:
+        session.add(
+            IncomeSchedule(
+                name="Paycheck",
+                frequency="biweekly",
+                next_pay_date=history_start.isoformat(),
+                typical_net_amount=Decimal("2390.43"),
+            )
+        )
+    session.commit()
+
+    paydays = max(1, min(plan_runs, history_paydays))
+    written = 0
+    while written < plan_runs:
+        count = min(batch_size, plan_runs - written)
+        runs, allocations, checks = [], [], []
+        for index in range(written, written + count):
+            paycheck_date = history_start + timedelta(days=14 * (index * paydays // plan_runs))
+            created_at = datetime.combine(paycheck_date, datetime.min.time()) + timedelta(seconds=rng.randint(0, 86_399))
+            run, allocation_rows, check_rows = _plan_rows(rng, paycheck_date, created_at)
+            runs.append(run)
+            allocations.extend(allocation_rows)
+            checks.extend(check_rows)
+        # Core table inserts skip the ORM bulk bookkeeping, which dominates at these volumes.
+        session.execute(PlanRun.__table__.insert(), runs)
+        session.execute(PlanAllocation.__table__.insert(), allocations)
+        session.execute(PlanCheck.__table__.insert(), checks)
+        session.commit()
+        written += count
+        if progress is not None:
+            progress(written)
+
+    return {"accounts": len(account_rows), "bills": bills, "debts": debts, "plan_runs": written}
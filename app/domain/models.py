@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import date
 from decimal import Decimal
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Bill:
     id: int
     name: str
@@ -17,10 +18,18 @@ class Bill:
     weekday_anchor: int | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Debt:
     id: int
     name: str
     balance: Decimal
     apr: Decimal
     min_payment: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class Transaction:
+    account_id: int
+    amount: Decimal
+    posted_on: date
+    description: str | None = None
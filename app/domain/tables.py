@@ -0,0 +1,152 @@
+"""Columnar (struct-of-arrays) domain tables for profiles with many recurring items.
+
+Amounts are stored as integer cents and cadences as small integer codes in ``array`` buffers,
+so a profile with thousands of bills costs a handful of arrays instead of one object and
+several Decimals per row. Tables can be built straight from SQL result tuples.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
+
+from app.domain.models import Bill, Debt
+
+CADENCE_UNKNOWN = 0
+CADENCE_WEEKLY = 1
+CADENCE_BIWEEKLY = 2
+CADENCE_MONTHLY = 3
+CADENCE_CODES = {"weekly": CADENCE_WEEKLY, "biweekly": CADENCE_BIWEEKLY, "monthly": CADENCE_MONTHLY}
+CADENCE_NAMES = ("", "weekly", "biweekly", "monthly")
+
+# Sentinel for nullable small-integer columns (due_day, weekday_anchor).
+NONE_CODE = -1
+
+
+def to_cents(value: object) -> int:
+    return int((Decimal(str(value)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def _code(value: int | None) -> int:
+    return NONE_CODE if value is None else value
+
+
+def _uncode(value: int) -> int | None:
+    return None if value == NONE_CODE else value
+
+
+@dataclass(slots=True)
+class BillTable:
+    ids: array = field(default_factory=lambda: array("q"))
+    names: list[str] = field(default_factory=list)
+    amount_cents: array = field(default_factory=lambda: array("q"))
+    cadence_codes: array = field(default_factory=lambda: array("b"))
+    # due_day and weekday_anchor are unconstrained INTEGER columns (out-of-range due days clamp to
+    # month end), so they get a full int rather than a byte.
+    due_days: array = field(default_factory=lambda: array("i"))
+    autopay: array = field(default_factory=lambda: array("b"))
+    weekday_anchors: array = field(default_factory=lambda: array("i"))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[object]]) -> BillTable:
+        """Build from ``(id, name, amount, cadence, due_day, autopay, weekday_anchor)`` tuples."""
+        table = cls()
+        for bill_id, name, amount, cadence, due_day, autopay, weekday_anchor in rows:
+            table.append(bill_id, name, amount, cadence, due_day, autopay, weekday_anchor)
+        return table
+
+    @classmethod
+    def from_bills(cls, bills: Iterable[Bill]) -> BillTable:
+        return cls.from_rows(
+            (b.id, b.name, b.amount, b.cadence, b.due_day, b.autopay, b.weekday_anchor) for b in bills
+        )
+
+    def append(
+        self,
+        bill_id: int,
+        name: str,
+        amount: object,
+        cadence: str,
+        due_day: int | None,
+        autopay: bool,
+        weekday_anchor: int | None = None,
+    ) -> None:
+        self.ids.append(bill_id)
+        self.names.append(name)
+        self.amount_cents.append(to_cents(amount))
+        self.cadence_codes.append(CADENCE_CODES.get(cadence, CADENCE_UNKNOWN))
+        self.due_days.append(_code(due_day))
+        self.autopay.append(1 if autopay else 0)
+        self.weekday_anchors.append(_code(weekday_anchor))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def cadence(self, index: int) -> str:
+        return CADENCE_NAMES[self.cadence_codes[index]]
+
+    def due_day(self, index: int) -> int | None:
+        return _uncode(self.due_days[index])
+
+    def bill(self, index: int) -> Bill:
+        """Materialize a single row as a ``Bill``."""
+        return Bill(
+            id=self.ids[index],
+            name=self.names[index],
+            amount=from_cents(self.amount_cents[index]),
+            cadence=self.cadence(index),
+            due_day=self.due_day(index),
+            autopay=bool(self.autopay[index]),
+            weekday_anchor=_uncode(self.weekday_anchors[index]),
+        )
+
+
+@dataclass(slots=True)
+class DebtTable:
+    ids: array = field(default_factory=lambda: array("q"))
+    names: list[str] = field(default_factory=list)
+    balance_cents: array = field(default_factory=lambda: array("q"))
+    # APR in thousandths of a percent, matching the Numeric(6, 3) column.
+    apr_milli: array = field(default_factory=lambda: array("q"))
+    min_payment_cents: array = field(default_factory=lambda: array("q"))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[object]]) -> DebtTable:
+        """Build from ``(id, name, balance, apr, min_payment)`` tuples."""
+        table = cls()
+        for debt_id, name, balance, apr, min_payment in rows:
+            table.append(debt_id, name, balance, apr, min_payment)
+        return table
+
+    @classmethod
+    def from_debts(cls, debts: Iterable[Debt]) -> DebtTable:
+        return cls.from_rows((x.id, x.name, x.balance, x.apr, x.min_payment) for x in debts)
+
+    def append(self, debt_id: int, name: str, balance: object, apr: object, min_payment: object) -> None:
+        self.ids.append(debt_id)
+        self.names.append(name)
+        self.balance_cents.append(to_cents(balance))
+        self.apr_milli.append(int((Decimal(str(apr)) * 1000).quantize(Decimal("1"), rounding=ROUND_HALF_UP)))
+        self.min_payment_cents.append(to_cents(min_payment))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def min_payment_total(self) -> Decimal:
+        return from_cents(sum(self.min_payment_cents))
+
+    def debt(self, index: int) -> Debt:
+        """Materialize a single row as a ``Debt``."""
+        return Debt(
+            id=self.ids[index],
+            name=self.names[index],
+            balance=from_cents(self.balance_cents[index]),
+            apr=Decimal(self.apr_milli[index]).scaleb(-3),
+            min_payment=from_cents(self.min_payment_cents[index]),
+        )
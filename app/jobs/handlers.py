@@ -0,0 +1,61 @@
+"""Built-in background job kinds."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from app.agent.payday_agent import generate_payday_plan
+from app.agent.plan_analytics import backfill_plan_analytics, count_plans_missing_analytics
+from app.jobs.queue import JobContext, job_handler
+
+MAX_REPLAN_PERIODS = 520
+
+
+class BackfillPlanAnalyticsPayload(BaseModel):
+    batch_size: int = Field(default=500, ge=1, le=10_000)
+
+
+class ReplanPayload(BaseModel):
+    paycheck_amount: Decimal = Field(..., gt=0)
+    start_date: date
+    periods: int = Field(default=1, ge=1, le=MAX_REPLAN_PERIODS)
+    interval_days: int = Field(default=14, gt=0)
+    override_buffer_amount: Decimal | None = Field(default=None, ge=0)
+
+
+@job_handler("backfill_plan_analytics", BackfillPlanAnalyticsPayload)
+def backfill_plan_analytics_job(session: Session, payload: dict[str, object], context: JobContext) -> dict[str, object]:
+    """Normalize allocation/check rows for plans stored before the analytics tables existed."""
+    params = BackfillPlanAnalyticsPayload.model_validate(payload)
+    total = count_plans_missing_analytics(session)
+    backfilled = backfill_plan_analytics(
+        session,
+        batch_size=params.batch_size,
+        progress=lambda done: context.report(done / total if total else 0.0),
+    )
+    return {"backfilled": backfilled}
+
+
+@job_handler("replan", ReplanPayload)
+def replan_job(session: Session, payload: dict[str, object], context: JobContext) -> dict[str, object]:
+    """Generate and store plans for a run of consecutive paydays (a forward projection or re-plan)."""
+    params = ReplanPayload.model_validate(payload)
+    interval = timedelta(days=params.interval_days)
+
+    plan_ids = []
+    for index in range(params.periods):
+        context.report(index / params.periods)
+        paycheck_date = params.start_date + interval * index
+        plan = generate_payday_plan(
+            session,
+            params.paycheck_amount,
+            paycheck_date,
+            override_buffer_amount=params.override_buffer_amount,
+            next_paycheck_date=paycheck_date + interval,
+        )
+        plan_ids.append(plan["plan_id"])
+    return {"plan_ids": plan_ids}
@@ -0,0 +1,306 @@
+"""SQLite-backed job queue with an in-process worker pool for long-running planning work."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import ColumnElement, and_, func, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import Job
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"succeeded", "failed", "cancelled"}
+POLL_INTERVAL_SECONDS = 1.0
+# Progress writes and cancel checks hit the database at most this often per job.
+CONTROL_INTERVAL_SECONDS = 0.25
+# Pause after each unit of work so request threads get the GIL and the SQLite write lock promptly;
+# background jobs trade throughput for flat interactive latency.
+YIELD_SECONDS = float(os.environ.get("FINANCE_COPILOT_JOB_YIELD_SECONDS", "0.01"))
+# A running job whose heartbeat is older than this is presumed orphaned by a dead process and is
+# requeued. Handlers must call ``JobContext.report`` at least this often.
+LEASE_SECONDS = float(os.environ.get("FINANCE_COPILOT_JOB_LEASE_SECONDS", "300"))
+# How often idle workers look for expired leases left by other processes.
+REQUEUE_CHECK_SECONDS = 60.0
+
+
+class UnknownJobKind(ValueError):
+    """No handler is registered for the requested job kind."""
+
+
+class InvalidJobPayload(ValueError):
+    """A submitted payload does not match the payload model registered for its job kind."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when the job was cancelled while running."""
+
+
+class JobLeaseLost(Exception):
+    """Raised inside a handler whose lease expired and was taken over by another worker."""
+
+
+JobHandler = Callable[[Session, dict[str, object], "JobContext"], dict[str, object] | None]
+JOB_HANDLERS: dict[str, JobHandler] = {}
+JOB_PAYLOAD_MODELS: dict[str, type[BaseModel]] = {}
+
+
+def job_handler(kind: str, payload_model: type[BaseModel] | None = None) -> Callable[[JobHandler], JobHandler]:
+    """Register a handler; ``payload_model`` validates payloads at submit time, not in the worker."""
+
+    def register(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        if payload_model is not None:
+            JOB_PAYLOAD_MODELS[kind] = payload_model
+        return handler
+
+    return register
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def job_to_dict(job: Job) -> dict[str, object]:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "priority": job.priority,
+        "progress": round(job.progress, 4),
+        "cancel_requested": job.cancel_requested,
+        "result": json.loads(job.result_json) if job.result_json else None,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def submit_job(session: Session, kind: str, payload: dict[str, object] | None = None, priority: int = 0) -> Job:
+    if kind not in JOB_HANDLERS:
+        raise UnknownJobKind(f"Unknown job kind {kind!r}; expected one of {', '.join(sorted(JOB_HANDLERS))}")
+    payload_model = JOB_PAYLOAD_MODELS.get(kind)
+    if payload_model is not None:
+        try:
+            payload = payload_model.model_validate(payload or {}).model_dump(mode="json")
+        except ValidationError as exc:
+            raise InvalidJobPayload(f"Invalid payload for job kind {kind!r}: {exc}") from exc
+    job = Job(
+        id=str(uuid4()),
+        kind=kind,
+        status="queued",
+        priority=priority,
+        progress=0.0,
+        payload_json=json.dumps(payload or {}),
+        cancel_requested=False,
+        created_at=_utcnow(),
+    )
+    session.add(job)
+    session.commit()
+    return job
+
+
+def get_job(session: Session, job_id: str) -> Job | None:
+    return session.get(Job, job_id)
+
+
+def cancel_job(session: Session, job_id: str) -> Job | None:
+    """Cancel a queued job immediately, or flag a running one for its handler to stop."""
+    # Conditional like the claim, so a worker that starts the job concurrently cannot be overwritten.
+    cancelled = session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == "queued")
+        .values(status="cancelled", cancel_requested=True, finished_at=_utcnow())
+    )
+    if cancelled.rowcount == 0:
+        session.execute(
+            update(Job).where(Job.id == job_id, Job.status.not_in(TERMINAL_STATUSES)).values(cancel_requested=True)
+        )
+    session.commit()
+    return session.get(Job, job_id, populate_existing=True)
+
+
+def claim_next_job(session: Session) -> Job | None:
+    """Atomically move the highest-priority queued job to running and return it."""
+    while True:
+        job_id = session.scalar(
+            select(Job.id)
+            .where(Job.status == "queued")
+            .order_by(Job.priority.desc(), Job.created_at, Job.id)
+            .limit(1)
+        )
+        if job_id is None:
+            return None
+        now = _utcnow()
+        claimed = session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(status="running", started_at=now, heartbeat_at=now)
+        )
+        session.commit()
+        if claimed.rowcount == 1:
+            return session.get(Job, job_id)
+        # Another worker won the race for this job; try the next one.
+
+
+def requeue_expired_jobs(session: Session, lease_seconds: float | None = None) -> int:
+    """Return running jobs whose lease expired (their process died) to the queue.
+
+    Jobs a live worker is running keep a fresh heartbeat, so several processes can share one
+    database without re-running each other's work.
+    """
+    cutoff = _utcnow() - timedelta(seconds=LEASE_SECONDS if lease_seconds is None else lease_seconds)
+    result = session.execute(
+        update(Job)
+        .where(Job.status == "running", func.coalesce(Job.heartbeat_at, Job.started_at) <= cutoff)
+        .values(status="queued", started_at=None, heartbeat_at=None, progress=0.0)
+    )
+    session.commit()
+    return result.rowcount or 0
+
+
+def _held_by(job_id: str, started_at: datetime | None) -> ColumnElement[bool]:
+    """Matches the job only while it is still running under the claim made at ``started_at``."""
+    return and_(Job.id == job_id, Job.status == "running", Job.started_at == started_at)
+
+
+class JobContext:
+    """Handed to handlers for progress reporting and cooperative cancellation."""
+
+    def __init__(self, session_factory: sessionmaker, job_id: str, started_at: datetime | None = None) -> None:
+        self._session_factory = session_factory
+        self.job_id = job_id
+        self.started_at = started_at
+        self._last_control = 0.0
+        self._cancelled = False
+
+    def _due(self, force: bool) -> bool:
+        now = time.monotonic()
+        if not force and now - self._last_control < CONTROL_INTERVAL_SECONDS:
+            return False
+        self._last_control = now
+        return True
+
+    def report(self, progress: float, force: bool = False) -> None:
+        """Record progress in [0, 1], renew the job's lease and raise ``JobCancelled`` if
+        cancellation was requested (``JobLeaseLost`` if another worker took the job over).
+
+        Handlers call this between units of work; it also yields to interactive requests.
+        """
+        if YIELD_SECONDS > 0:
+            time.sleep(YIELD_SECONDS)
+        if not self._due(force):
+            return
+        with self._session_factory() as session:
+            renewed = session.execute(
+                update(Job)
+                .where(_held_by(self.job_id, self.started_at))
+                .values(progress=max(0.0, min(1.0, progress)), heartbeat_at=_utcnow())
+            )
+            session.commit()
+            if renewed.rowcount == 0:
+                raise JobLeaseLost()
+            self._cancelled = bool(session.scalar(select(Job.cancel_requested).where(Job.id == self.job_id)))
+        if self._cancelled:
+            raise JobCancelled()
+
+
+def run_job(session_factory: sessionmaker, job: Job) -> None:
+    handler = JOB_HANDLERS.get(job.kind)
+    context = JobContext(session_factory, job.id, job.started_at)
+    status, result, error = "succeeded", None, None
+    try:
+        if handler is None:
+            raise UnknownJobKind(f"Unknown job kind {job.kind!r}")
+        with session_factory() as session:
+            result = handler(session, json.loads(job.payload_json or "{}"), context)
+    except JobCancelled:
+        status = "cancelled"
+    except JobLeaseLost:
+        logger.warning("Job %s (%s) lease expired; another worker has taken it over", job.id, job.kind)
+        return
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed", job.id, job.kind)
+        status, error = "failed", f"{type(exc).__name__}: {exc}"
+
+    with session_factory() as session:
+        values: dict[str, object] = {"status": status, "error": error, "finished_at": _utcnow()}
+        if status == "succeeded":
+            values.update(progress=1.0, result_json=json.dumps(result) if result is not None else None)
+        # Only the worker still holding the claim records the outcome.
+        session.execute(update(Job).where(_held_by(job.id, job.started_at)).values(**values))
+        session.commit()
+
+
+class JobWorkerPool:
+    """Daemon worker threads that claim and run queued jobs until stopped."""
+
+    def __init__(self, session_factory: sessionmaker, workers: int = 2) -> None:
+        self.session_factory = session_factory
+        self.workers = workers
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._last_requeue_check = 0.0
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self) -> None:
+        if self.running or self.workers <= 0:
+            return
+        self._stop.clear()
+        self._requeue_expired()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{n}", daemon=True) for n in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        """Wake idle workers after a submit instead of waiting for the next poll."""
+        self._wake.set()
+
+    def _requeue_expired(self) -> None:
+        self._last_requeue_check = time.monotonic()
+        try:
+            with self.session_factory() as session:
+                requeue_expired_jobs(session)
+        except Exception:
+            logger.exception("Requeueing expired jobs failed")
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with self.session_factory() as session:
+                    job = claim_next_job(session)
+                    if job is not None:
+                        session.expunge(job)
+            except Exception:
+                logger.exception("Job claim failed")
+                job = None
+            if job is None:
+                if time.monotonic() - self._last_requeue_check >= REQUEUE_CHECK_SECONDS:
+                    self._requeue_expired()
+                self._wake.wait(POLL_INTERVAL_SECONDS)
+                self._wake.clear()
+                continue
+            run_job(self.session_factory, job)
@@ -0,0 +1,220 @@
+"""Load-test harness that drives the API against a disposable, seeded SQLite database."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.init_db import init_db
+from app.db.session import SessionLocal, engine
+from app.db.synthetic import generate_synthetic_profile
+
+OPERATIONS = ("plan", "list", "get")
+DEFAULT_MIX = {"plan": 1.0, "list": 3.0, "get": 6.0}
+PLAN_REQUEST = {"paycheck_amount": "2390.43", "paycheck_date": "2026-01-05", "next_paycheck_date": "2026-01-19"}
+SERVER_START_TIMEOUT_SECONDS = 15.0
+
+
+@dataclass
+class LoadTestConfig:
+    requests: int = 500
+    concurrency: int = 8
+    # Target arrival rate in requests/second; None sends as fast as the workers allow.
+    rate: float | None = None
+    mix: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    target: str = "inprocess"
+    warmup_plans: int = 5
+    seed: int = 0
+    # Size of the synthetic profile seeded into the disposable database.
+    profile_bills: int = 200
+    history_plans: int = 1_000
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """Parse ``plan=1,list=3,get=6`` into operation weights."""
+    mix: dict[str, float] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r}; expected one of {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    if not any(w > 0 for w in mix.values()):
+        raise ValueError("Operation mix needs at least one positive weight")
+    return mix
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _latency_summary(latencies: list[float]) -> dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "p50": round(percentile(ordered, 50), 3),
+        "p95": round(percentile(ordered, 95), 3),
+        "p99": round(percentile(ordered, 99), 3),
+        "max": round(ordered[-1], 3) if ordered else 0.0,
+        "mean": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+    }
+
+
+@contextmanager
+def _disposable_database(config: LoadTestConfig) -> Iterator[str]:
+    with tempfile.TemporaryDirectory(prefix="finance-copilot-loadtest-") as tmp:
+        database_url = f"sqlite:///{Path(tmp) / 'loadtest.db'}"
+        seed_engine = create_engine(database_url)
+        try:
+            init_db(seed_engine)
+            with sessionmaker(bind=seed_engine)() as session:
+                generate_synthetic_profile(
+                    session, seed=config.seed, bills=config.profile_bills, plan_runs=config.history_plans
+                )
+        finally:
+            seed_engine.dispose()
+        yield database_url
+
+
+@asynccontextmanager
+async def _inprocess_client(database_url: str) -> AsyncIterator[httpx.AsyncClient]:
+    from app.api.main import app
+
+    test_engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    SessionLocal.configure(bind=test_engine)
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            yield client
+    finally:
+        SessionLocal.configure(bind=engine)
+        test_engine.dispose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def _uvicorn_client(database_url: str) -> AsyncIterator[httpx.AsyncClient]:
+    port = _free_port()
+    env = {**os.environ, "FINANCE_COPILOT_DATABASE_URL": database_url}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.api.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+            while True:
+                try:
+                    await client.get("/plans")
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline or server.poll() is not None:
+                        raise RuntimeError("uvicorn did not start")
+                    await asyncio.sleep(0.1)
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+async def _drive(client: httpx.AsyncClient, config: LoadTestConfig) -> dict[str, object]:
+    rng = random.Random(config.seed)
+    names = [name for name in OPERATIONS if config.mix.get(name, 0) > 0]
+    schedule = rng.choices(names, weights=[config.mix[name] for name in names], k=config.requests)
+
+    plan_ids: list[str] = []
+    for _ in range(config.warmup_plans):
+        response = await client.post("/plan/payday", json=PLAN_REQUEST)
+        response.raise_for_status()
+        plan_ids.append(response.json()["plan_id"])
+
+    latencies: dict[str, list[float]] = {name: [] for name in names}
+    errors: dict[str, int] = {name: 0 for name in names}
+    next_index = 0
+    started = time.perf_counter()
+
+    async def send(op: str) -> httpx.Response:
+        if op == "plan":
+            return await client.post("/plan/payday", json=PLAN_REQUEST)
+        if op == "list":
+            return await client.get("/plans")
+        return await client.get(f"/plans/{rng.choice(plan_ids)}")
+
+    async def worker() -> None:
+        nonlocal next_index
+        while next_index < len(schedule):
+            index = next_index
+            next_index += 1
+            op = schedule[index]
+            begin = time.perf_counter()
+            if config.rate:
+                # Measure from the scheduled send time so queueing delay counts against latency.
+                scheduled = started + index / config.rate
+                await asyncio.sleep(max(0.0, scheduled - begin))
+                begin = scheduled
+            try:
+                response = await send(op)
+                failed = response.status_code >= 400
+                if op == "plan" and not failed:
+                    plan_ids.append(response.json()["plan_id"])
+            except httpx.HTTPError:
+                failed = True
+            latencies[op].append((time.perf_counter() - begin) * 1000)
+            if failed:
+                errors[op] += 1
+
+    await asyncio.gather(*(worker() for _ in range(max(1, config.concurrency))))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "target": config.target,
+        "requests": len(schedule),
+        "concurrency": config.concurrency,
+        "target_rate": config.rate,
+        "mix": {name: config.mix[name] for name in names},
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(schedule) / elapsed, 3) if elapsed else 0.0,
+        "errors": sum(errors.values()),
+        "latency_ms": _latency_summary(all_latencies),
+        "operations": {
+            name: {"count": len(latencies[name]), "errors": errors[name], "latency_ms": _latency_summary(latencies[name])}
+            for name in names
+        },
+    }
+
+
+async def run_load_test_async(config: LoadTestConfig) -> dict[str, object]:
+    if config.target not in {"inprocess", "uvicorn"}:
+        raise ValueError("target must be 'inprocess' or 'uvicorn'")
+    with _disposable_database(config) as database_url:
+        open_client = _inprocess_client if config.target == "inprocess" else _uvicorn_client
+        async with open_client(database_url) as client:
+            return await _drive(client, config)
+
+
+def run_load_test(config: LoadTestConfig) -> dict[str, object]:
+    return asyncio.run(run_load_test_async(config))
@@ -1,6 +1,47 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture()
+def make_session_factory(tmp_path):
+    """Build sessionmakers over disposable, migrated SQLite files; engines are disposed afterwards."""
+    pytest.importorskip("sqlalchemy")
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db.init_db import init_db
+
+    engines = []
+
+    def make(name: str = "test.db"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}", connect_args={"check_same_thread": False})
+        init_db(engine)
+        engines.append(engine)
+        return sessionmaker(bind=engine)
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.fixture()
+def session_factory(make_session_factory):
+    """Sessionmaker over a disposable database seeded with the demo profile."""
+    from app.db.seed import seed_demo_data
+
+    factory = make_session_factory()
+    with factory() as session:
+        seed_demo_data(session)
+    return factory
+
+
+@pytest.fixture()
+def seeded_session(session_factory):
+    with session_factory() as session:
+        yield session
@@ -1,11 +1,20 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
 import pytest
 
 fastapi = pytest.importorskip("fastapi")
 pytest.importorskip("sqlalchemy")
 
 from fastapi.testclient import TestClient
+from sqlalchemy import select
 
+from app.agent.payday_agent import _PLAN_ETAG_QUERY, set_allocation_rules
+from app.agent.plan_events import plan_broadcaster
 from app.api.main import app
+from app.db.models import Preference
 
 
 def test_plan_persistence_and_history_endpoints() -> None:
@@ -46,3 +55,174 @@ def test_plan_persistence_and_history_endpoints() -> None:
     assert detail_body['plan_id'] == plan_id
     assert detail_body['plan']['checks']['allocations_sum_ok'] is True
     assert detail_body['plan']['inputs']['paycheck_amount'] == '2390.43'
+
+
+def test_idempotency_key_replays_stored_plan() -> None:
+    with TestClient(app) as client:
+        client.post('/seed/demo')
+        key = f'test-{uuid4()}'
+        body = {'paycheck_amount': '2390.43', 'paycheck_date': '2026-01-05', 'next_paycheck_date': '2026-01-12'}
+
+        first = client.post('/plan/payday', json=body, headers={'Idempotency-Key': key})
+        assert first.status_code == 200
+        assert 'Idempotent-Replayed' not in first.headers
+
+        retry = client.post('/plan/payday', json=body, headers={'Idempotency-Key': key})
+        assert retry.status_code == 200
+        assert retry.headers['Idempotent-Replayed'] == 'true'
+        assert retry.json() == first.json()
+
+        changed = client.post('/plan/payday', json={**body, 'paycheck_amount': '100.00'}, headers={'Idempotency-Key': key})
+        assert changed.status_code == 422
+
+
+def test_concurrent_duplicates_share_one_plan() -> None:
+    with TestClient(app) as client:
+        client.post('/seed/demo')
+        key = f'test-{uuid4()}'
+        body = {'paycheck_amount': '2390.43', 'paycheck_date': '2026-01-05'}
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            responses = list(
+                pool.map(lambda _: client.post('/plan/payday', json=body, headers={'Idempotency-Key': key}), range(4))
+            )
+        assert all(r.status_code == 200 for r in responses)
+        assert len({r.json()['plan_id'] for r in responses}) == 1
+
+
+def test_plan_endpoints_answer_conditional_requests_with_304() -> None:
+    with TestClient(app) as client:
+        client.post('/seed/demo')
+        plan_id = client.post('/plan/payday', json={'paycheck_amount': '2390.43', 'paycheck_date': '2026-01-05'}).json()['plan_id']
+
+        detail = client.get(f'/plans/{plan_id}')
+        assert 'immutable' in detail.headers['Cache-Control']
+        etag = detail.headers['ETag']
+        cached = client.get(f'/plans/{plan_id}', headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.headers['ETag'] == etag
+
+        listing = client.get('/plans')
+        list_etag = listing.headers['ETag']
+        assert client.get('/plans', headers={'If-None-Match': list_etag}).status_code == 304
+
+        client.post('/plan/payday', json={'paycheck_amount': '2390.43', 'paycheck_date': '2026-01-05'})
+        assert client.get('/plans', headers={'If-None-Match': list_etag}).status_code == 200
+
+
+def test_allocation_rules_round_trip_and_drive_plans() -> None:
+    with TestClient(app) as client:
+        client.post('/seed/demo')
+        rules = [
+            {'bucket': 'Bills', 'source': 'bills'},
+            {'bucket': 'Spending', 'source': 'buffer'},
+            {'bucket': 'DebtMinimum', 'source': 'debt_minimums'},
+            {'bucket': 'Savings', 'source': 'remainder'},
+        ]
+        try:
+            assert client.put('/preferences/allocation-rules', json={'rules': rules[:1]}).status_code == 422
+
+            stored = client.put('/preferences/allocation-rules', json={'rules': rules})
+            assert stored.status_code == 200
+            plan = client.post('/plan/payday', json={'paycheck_amount': '2390.43', 'paycheck_date': '2026-01-05'}).json()
+            assert [a['bucket'] for a in plan['allocations']] == ['Bills', 'Spending', 'DebtMinimum', 'Savings']
+            assert plan['inputs']['allocation_rules_version'] == stored.json()['version']
+        finally:
+            client.put('/preferences/allocation-rules', json={'rules': None})
+
+
+def test_plan_includes_daily_timeline_on_request() -> None:
+    with TestClient(app) as client:
+        client.post('/seed/demo')
+        body = {'paycheck_amount': '2390.43', 'paycheck_date': '2026-01-05', 'next_paycheck_date': '2026-01-19'}
+        assert client.post('/plan/payday', json=body).json()['timeline'] is None
+
+        timeline = client.post('/plan/payday', json={**body, 'include_timeline': True}).json()['timeline']
+        assert len(timeline['days']) == 14
+        assert timeline['days'][0]['inflow'] == '2390.43'
+        assert 'min_balance_date' in timeline
+
+
+def test_allocation_rule_versions_are_never_reused(session_factory) -> None:
+    rules = [{"bucket": "Bills", "source": "bills"}, {"bucket": "Rest", "source": "remainder"}]
+    with session_factory() as first, session_factory() as second:
+        stale = first.scalar(select(Preference))  # held in ``first`` while ``second`` commits
+        start = stale.allocation_rules_version
+        assert set_allocation_rules(second, rules)["version"] == start + 1
+        assert set_allocation_rules(first, rules[1:])["version"] == start + 2
+
+
+def test_plan_etag_lookup_reads_only_the_covering_index(seeded_session) -> None:
+    plan = seeded_session.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {_PLAN_ETAG_QUERY.text}", {"plan_id": "x"}
+    ).all()
+    assert "COVERING INDEX ix_plan_runs_id_etag" in plan[0][-1]
+
+
+def test_job_submit_rejects_invalid_payload_with_422() -> None:
+    with TestClient(app) as client:
+        response = client.post('/jobs', json={'kind': 'replan', 'payload': {}})
+        assert response.status_code == 422
+        assert 'start_date' in response.json()['detail']
+
+
+async def stream_plans(on_connect, disconnect_when=lambda body: False, disconnect_at_once=False) -> str:
+    """Drive ``GET /plans/stream`` over raw ASGI; returns the body streamed before it ended."""
+    scope = {"type": "http", "method": "GET", "path": "/plans/stream", "query_string": b"", "headers": []}
+    body = []
+    requested = False
+    disconnected = asyncio.Event()
+    if disconnect_at_once:
+        disconnected.set()
+
+    async def receive() -> dict[str, object]:
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, object]) -> None:
+        if disconnect_at_once and message["type"] == "http.response.start":
+            await asyncio.sleep(0.1)  # let the disconnect land before the body is iterated
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b"").decode())
+            if body[-1] == ": connected\n\n":
+                on_connect()
+            if disconnect_when("".join(body)):
+                disconnected.set()
+
+    await asyncio.wait_for(app(scope, receive, send), timeout=5)
+    return "".join(body)
+
+
+def plan_event(n: int) -> dict[str, object]:
+    return {"plan_id": f"p{n}", "created_at": "2026-01-05 00:00:00", "paycheck_date": "2026-01-05",
+            "paycheck_amount": "2390.43", "checks_summary": "4/4"}
+
+
+def test_plan_stream_frames_events_and_unsubscribes_on_disconnect() -> None:
+    body = asyncio.run(
+        stream_plans(lambda: plan_broadcaster.publish(plan_event(1)), disconnect_when=lambda b: "event: plan" in b)
+    )
+    frame = body.split("\n\n")[1]
+    assert frame.startswith("event: plan\nid: p1\ndata: ")
+    assert json.loads(frame.split("data: ", 1)[1]) == plan_event(1)
+    assert not plan_broadcaster.has_subscribers
+
+
+def test_plan_stream_sends_resync_and_closes_when_subscriber_overflows() -> None:
+    def flood() -> None:
+        for n in range(plan_broadcaster.queue_size + 1):
+            plan_broadcaster.publish(plan_event(n))
+
+    body = asyncio.run(stream_plans(flood))
+    assert body.endswith("event: resync\ndata: {}\n\n")
+    assert "event: plan" not in body
+    assert not plan_broadcaster.has_subscribers
+
+
+def test_plan_stream_disconnect_before_first_chunk_leaves_no_subscription() -> None:
+    asyncio.run(stream_plans(lambda: None, disconnect_at_once=True))
+    assert not plan_broadcaster.has_subscribers
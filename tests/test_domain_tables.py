@@ -0,0 +1,63 @@
+from datetime import date
+from decimal import Decimal
+
+from app.calculators.payday import compute_plan, due_amount, table_due_cents
+from app.domain.models import Bill, Debt
+from app.domain.tables import BillTable, DebtTable
+
+
+def sample_bills() -> list[Bill]:
+    return [
+        Bill(id=1, name="Rent", amount=Decimal("1200.00"), cadence="monthly", due_day=1, autopay=True),
+        Bill(id=2, name="Internet", amount=Decimal("80.00"), cadence="monthly", due_day=10, autopay=True),
+        Bill(id=3, name="Groceries", amount=Decimal("100.00"), cadence="weekly", due_day=None, autopay=False, weekday_anchor=5),
+        Bill(id=4, name="Daycare", amount=Decimal("450.50"), cadence="biweekly", due_day=None, autopay=True),
+        Bill(id=5, name="Gym", amount=Decimal("45.00"), cadence="yearly", due_day=3, autopay=True),
+    ]
+
+
+def sample_debts() -> list[Debt]:
+    return [
+        Debt(id=1, name="Student Loan", balance=Decimal("8000.00"), apr=Decimal("5.125"), min_payment=Decimal("120.00")),
+        Debt(id=2, name="Credit Card", balance=Decimal("1800.00"), apr=Decimal("21.00"), min_payment=Decimal("65.55")),
+    ]
+
+
+def test_table_round_trips_rows() -> None:
+    table = BillTable.from_bills(sample_bills())
+    assert len(table) == 5
+    assert [table.bill(i) for i in range(4)] == sample_bills()[:4]
+    debts = DebtTable.from_debts(sample_debts())
+    assert [debts.debt(i) for i in range(2)] == sample_debts()
+
+
+def test_table_due_cents_matches_due_amount() -> None:
+    start, end = date(2026, 1, 5), date(2026, 2, 2)
+    table = BillTable.from_bills(sample_bills())
+    expected = [int(due_amount(b, start, end) * 100) for b in sample_bills()]
+    assert table_due_cents(table, start, end) == expected
+
+
+def test_compute_plan_accepts_tables() -> None:
+    kwargs = dict(
+        paycheck_amount=Decimal("2500.00"),
+        paycheck_date=date(2026, 1, 5),
+        period_end=date(2026, 1, 19),
+        buffer_target=Decimal("600.00"),
+        min_cash_buffer=Decimal("2000.00"),
+        primary_surplus_target="invest",
+        starting_liquid_cash=Decimal("5000.00"),
+    )
+    from_objects = compute_plan(bills=sample_bills(), debts=sample_debts(), **kwargs)
+    from_tables = compute_plan(
+        bills=BillTable.from_bills(sample_bills()), debts=DebtTable.from_debts(sample_debts()), **kwargs
+    )
+    assert from_tables == from_objects
+
+
+def test_out_of_range_due_day_clamps_like_objects() -> None:
+    bill = Bill(id=9, name="Odd", amount=Decimal("10.00"), cadence="monthly", due_day=200, autopay=True)
+    start, end = date(2026, 2, 1), date(2026, 3, 1)
+    table = BillTable.from_bills([bill])
+    assert table.bill(0) == bill
+    assert table_due_cents(table, start, end) == [int(due_amount(bill, start, end) * 100)] == [1000]
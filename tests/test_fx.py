@@ -0,0 +1,98 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import event
+
+from app.agent import fx
+from app.agent.fx import MissingFxRateError, clear_fx_cache, convert_balances, store_fx_rates
+from app.agent.payday_agent import generate_payday_plan
+from app.db.models import Account
+
+
+@pytest.fixture(autouse=True)
+def fresh_fx_cache():
+    clear_fx_cache()
+    yield
+    clear_fx_cache()
+
+
+def test_plan_converts_foreign_balances_and_records_conversions(seeded_session) -> None:
+    seeded_session.add(Account(name="US Checking", type="checking", currency="USD", balance=Decimal("100.00")))
+    seeded_session.commit()
+    store_fx_rates(
+        seeded_session,
+        [
+            {"base_currency": "USD", "quote_currency": "CAD", "effective_date": date(2026, 1, 1), "rate": "1.30"},
+            {"base_currency": "USD", "quote_currency": "CAD", "effective_date": date(2026, 1, 5), "rate": "1.35"},
+            {"base_currency": "USD", "quote_currency": "CAD", "effective_date": date(2026, 2, 1), "rate": "1.50"},
+        ],
+    )
+
+    plan = generate_payday_plan(seeded_session, Decimal("2390.43"), date(2026, 1, 10))
+
+    assert plan["starting_liquid_cash"] == "3835.00"
+    assert plan["details"]["currency"] == "CAD"
+    assert plan["details"]["fx_conversions"] == [
+        {"currency": "USD", "amount": "100.00", "rate": "1.35000000", "rate_date": "2026-01-05", "converted": "135.00"}
+    ]
+
+
+def test_single_currency_plan_records_no_conversions(seeded_session) -> None:
+    plan = generate_payday_plan(seeded_session, Decimal("2390.43"), date(2026, 1, 10))
+    assert plan["starting_liquid_cash"] == "3700.00"
+    assert plan["details"]["fx_conversions"] == []
+
+
+def test_inverse_rate_is_used_when_direct_pair_is_missing(seeded_session) -> None:
+    store_fx_rates(seeded_session, [{"base_currency": "cad", "quote_currency": "eur", "effective_date": "2026-01-01", "rate": "0.5"}])
+    total, conversions = convert_balances(seeded_session, {"EUR": Decimal("10.00")}, "CAD", date(2026, 1, 2))
+    assert total == Decimal("20.00")
+    assert conversions[0]["rate_date"] == "2026-01-01"
+
+
+def test_direct_and_inverse_rates_resolve_in_one_query(seeded_session) -> None:
+    store_fx_rates(
+        seeded_session,
+        [
+            {"base_currency": "USD", "quote_currency": "CAD", "effective_date": "2026-01-01", "rate": "1.25"},
+            {"base_currency": "CAD", "quote_currency": "EUR", "effective_date": "2026-01-01", "rate": "0.5"},
+            {"base_currency": "CAD", "quote_currency": "GBP", "effective_date": "2026-01-01", "rate": "0.4"},
+        ],
+    )
+    statements = []
+    engine = seeded_session.get_bind()
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        total, _ = convert_balances(
+            seeded_session, {"USD": Decimal("4.00"), "EUR": Decimal("1.00"), "GBP": Decimal("2.00")}, "CAD", date(2026, 1, 2)
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert total == Decimal("12.00")
+    assert len(statements) == 1
+
+
+def test_missing_rate_raises(seeded_session) -> None:
+    store_fx_rates(seeded_session, [{"base_currency": "USD", "quote_currency": "CAD", "effective_date": "2026-03-01", "rate": "1.4"}])
+    with pytest.raises(MissingFxRateError, match="USD"):
+        convert_balances(seeded_session, {"USD": Decimal("1.00")}, "CAD", date(2026, 2, 1))
+
+
+def test_rates_are_cached_per_pair_and_date_until_rates_change(seeded_session) -> None:
+    store_fx_rates(seeded_session, [{"base_currency": "USD", "quote_currency": "CAD", "effective_date": "2026-01-01", "rate": "1.3"}])
+    on = date(2026, 1, 10)
+    convert_balances(seeded_session, {"USD": Decimal("1.00")}, "CAD", on)
+    assert fx._rate_cache[("USD", "CAD", on)] == (Decimal("1.3"), "2026-01-01")
+
+    fx._rate_cache[("USD", "CAD", on)] = (Decimal("2"), "2026-01-01")
+    total, _ = convert_balances(seeded_session, {"USD": Decimal("1.00")}, "CAD", on)
+    assert total == Decimal("2.00")
+
+    store_fx_rates(seeded_session, [{"base_currency": "USD", "quote_currency": "CAD", "effective_date": "2026-01-01", "rate": "1.4"}])
+    total, _ = convert_balances(seeded_session, {"USD": Decimal("1.00")}, "CAD", on)
+    assert total == Decimal("1.40")
@@ -0,0 +1,45 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import func, select
+
+from app.agent import idempotency
+from app.agent.idempotency import IdempotencyKeyTimeout, run_idempotent
+from app.agent.payday_agent import generate_payday_plan
+from app.db.models import IdempotencyKey, PlanRun
+
+
+def test_crash_after_plan_commit_replays_instead_of_recomputing(seeded_session) -> None:
+    def store_then_crash() -> dict[str, object]:
+        generate_payday_plan(seeded_session, Decimal("2390.43"), date(2026, 1, 5), idempotency_key="crash")
+        raise RuntimeError("process died before run_idempotent finished")
+
+    with pytest.raises(RuntimeError):
+        run_idempotent(seeded_session, "crash", "fp", store_then_crash)
+
+    def recompute() -> dict[str, object]:
+        raise AssertionError("a completed key must not be recomputed")
+
+    replay, replayed = run_idempotent(seeded_session, "crash", "fp", recompute)
+    assert replayed is True
+    assert replay["plan_id"] == seeded_session.scalar(select(PlanRun.id))
+    assert seeded_session.scalar(select(func.count(PlanRun.id))) == 1
+
+
+def test_slow_claim_past_the_wait_budget_is_not_taken_over(seeded_session, monkeypatch) -> None:
+    monkeypatch.setattr(idempotency, "WAIT_TIMEOUT_SECONDS", 0.1)
+    started = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=60)
+    seeded_session.add(
+        IdempotencyKey(
+            key="slow", fingerprint="fp", status="pending", created_at=started, expires_at=started + timedelta(days=1)
+        )
+    )
+    seeded_session.commit()
+
+    with pytest.raises(IdempotencyKeyTimeout):
+        run_idempotent(seeded_session, "slow", "fp", lambda: {"recomputed": True})
+    assert seeded_session.scalar(select(IdempotencyKey.status).where(IdempotencyKey.key == "slow")) == "pending"
@@ -0,0 +1,114 @@
+import time
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from app.jobs import handlers  # noqa: F401
+from app.jobs.queue import (
+    InvalidJobPayload,
+    JobContext,
+    JobLeaseLost,
+    JobWorkerPool,
+    UnknownJobKind,
+    cancel_job,
+    claim_next_job,
+    get_job,
+    requeue_expired_jobs,
+    submit_job,
+)
+
+
+def wait_for(factory, job_id: str, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with factory() as session:
+            job = get_job(session, job_id)
+            if job.status in {"succeeded", "failed", "cancelled"}:
+                return job
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_claim_order_follows_priority_then_age(session_factory) -> None:
+    with session_factory() as session:
+        low = submit_job(session, "backfill_plan_analytics").id
+        high = submit_job(session, "backfill_plan_analytics", priority=5).id
+        assert claim_next_job(session).id == high
+        assert claim_next_job(session).id == low
+        assert claim_next_job(session) is None
+        with pytest.raises(UnknownJobKind):
+            submit_job(session, "nope")
+
+
+def test_worker_pool_runs_replan_job_with_progress(session_factory) -> None:
+    with session_factory() as session:
+        job_id = submit_job(
+            session, "replan", {"paycheck_amount": "2390.43", "start_date": "2026-01-05", "periods": 3}
+        ).id
+    pool = JobWorkerPool(session_factory, workers=2)
+    pool.start()
+    try:
+        pool.notify()
+        job = wait_for(session_factory, job_id)
+    finally:
+        pool.stop()
+    assert job.status == "succeeded", job.error
+    assert job.progress == 1.0
+    assert '"plan_ids"' in job.result_json
+
+
+def test_cancelling_queued_job_prevents_it_from_running(session_factory) -> None:
+    with session_factory() as session:
+        job_id = submit_job(session, "replan", {"paycheck_amount": "100", "start_date": "2026-01-05"}).id
+        assert cancel_job(session, job_id).status == "cancelled"
+        assert claim_next_job(session) is None
+
+
+def test_cancel_racing_a_claim_flags_the_running_job(session_factory) -> None:
+    with session_factory() as api, session_factory() as worker:
+        job_id = submit_job(api, "replan", {"paycheck_amount": "100", "start_date": "2026-01-05"}).id
+        assert get_job(api, job_id).status == "queued"
+        assert claim_next_job(worker).id == job_id
+
+        job = cancel_job(api, job_id)
+        assert job.status == "running"
+        assert job.cancel_requested is True
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {},
+        {"paycheck_amount": "100", "start_date": "not-a-date"},
+        {"paycheck_amount": "100", "start_date": "2026-01-05", "periods": 0},
+        {"paycheck_amount": "100", "start_date": "2026-01-05", "interval_days": -7},
+    ],
+)
+def test_invalid_payloads_are_rejected_at_submit(session_factory, payload) -> None:
+    with session_factory() as session:
+        with pytest.raises(InvalidJobPayload):
+            submit_job(session, "replan", payload)
+        assert claim_next_job(session) is None
+
+
+def test_only_jobs_with_expired_leases_are_requeued(session_factory) -> None:
+    with session_factory() as session:
+        job_id = submit_job(session, "backfill_plan_analytics").id
+        claim_next_job(session)
+        # A sibling process starting up must leave a job with a live heartbeat alone.
+        assert requeue_expired_jobs(session) == 0
+        assert get_job(session, job_id).status == "running"
+        assert requeue_expired_jobs(session, lease_seconds=0) == 1
+        assert get_job(session, job_id).status == "queued"
+
+
+def test_worker_that_lost_its_lease_stops_without_recording_a_result(session_factory) -> None:
+    with session_factory() as session:
+        job_id = submit_job(session, "backfill_plan_analytics").id
+        stale_claim = claim_next_job(session).started_at
+        context = JobContext(session_factory, job_id, stale_claim)
+        requeue_expired_jobs(session, lease_seconds=0)
+        assert claim_next_job(session).started_at != stale_claim
+        with pytest.raises(JobLeaseLost):
+            context.report(0.5, force=True)
@@ -0,0 +1,41 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import select
+
+from app.agent.ledger import UnknownAccountError, liquid_cash_by_currency, post_transactions
+from app.db.models import Account, LedgerEntry
+from app.domain.models import Transaction
+
+
+def test_posting_updates_balances_and_running_totals(seeded_session) -> None:
+    checking = seeded_session.scalar(select(Account).where(Account.name == "Main Checking"))
+    balances = post_transactions(
+        seeded_session,
+        [
+            Transaction(account_id=checking.id, amount=Decimal("-45.10"), posted_on=date(2026, 1, 6)),
+            Transaction(account_id=checking.id, amount=Decimal("0.10"), posted_on=date(2026, 1, 7)),
+            Transaction(account_id=checking.id, amount=Decimal("2390.43"), posted_on=date(2026, 1, 7)),
+        ],
+    )
+    assert balances == {checking.id: Decimal("3545.43")}
+    running = seeded_session.scalars(select(LedgerEntry.balance_after_cents).order_by(LedgerEntry.id)).all()
+    assert running == [115490, 115500, 354543]
+    assert liquid_cash_by_currency(seeded_session) == {"CAD": Decimal("6045.43")}
+
+
+def test_unknown_account_rejects_whole_batch(seeded_session) -> None:
+    with pytest.raises(UnknownAccountError):
+        post_transactions(
+            seeded_session,
+            [
+                Transaction(account_id=1, amount=Decimal("10.00"), posted_on=date(2026, 1, 6)),
+                Transaction(account_id=999, amount=Decimal("10.00"), posted_on=date(2026, 1, 6)),
+            ],
+        )
+    assert seeded_session.scalar(select(LedgerEntry.id)) is None
+    assert liquid_cash_by_currency(seeded_session) == {"CAD": Decimal("3700.00")}
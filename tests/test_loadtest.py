@@ -0,0 +1,27 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlalchemy")
+
+from app.loadtest import LoadTestConfig, parse_mix, percentile, run_load_test
+
+
+def test_percentile_uses_nearest_rank() -> None:
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_parse_mix_rejects_unknown_operations() -> None:
+    assert parse_mix("plan=2,get=1") == {"plan": 2.0, "get": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("delete=1")
+
+
+def test_inprocess_load_test_reports_percentiles() -> None:
+    report = run_load_test(LoadTestConfig(requests=30, concurrency=4, warmup_plans=2))
+    assert report["requests"] == 30
+    assert report["errors"] == 0
+    assert set(report["latency_ms"]) >= {"p50", "p95", "p99"}
+    assert sum(op["count"] for op in report["operations"].values()) == 30
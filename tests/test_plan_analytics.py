@@ -0,0 +1,38 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import func, select
+
+from app.agent.payday_agent import generate_payday_plan
+from app.agent.plan_analytics import backfill_plan_analytics, plan_stats
+from app.db.models import PlanAllocation, PlanRun
+
+
+def test_stats_group_allocations_by_month_and_bucket(seeded_session) -> None:
+    for paycheck_date in (date(2026, 1, 5), date(2026, 1, 19), date(2026, 2, 2)):
+        generate_payday_plan(seeded_session, Decimal("5000.00"), paycheck_date)
+
+    stats = plan_stats(seeded_session, start=date(2026, 1, 1), end=date(2026, 2, 1))
+    assert {row["period"] for row in stats["allocations"]} == {"2026-01"}
+    totals = {row["bucket"]: row for row in stats["allocations"]}
+    assert totals["Spending"]["total"] == "1200.00"
+    assert totals["Spending"]["plans"] == 2
+    assert {row["name"]: row["total"] for row in stats["checks"]}["bills_covered_ok"] == 2
+
+    yearly = plan_stats(seeded_session, period="year")
+    assert sum(row["plans"] for row in yearly["allocations"] if row["bucket"] == "Bills") == 3
+
+
+def test_backfill_normalizes_legacy_plans(seeded_session) -> None:
+    payload = {"allocations": [{"bucket": "Invest", "amount": "12.34"}], "checks": {"bills_covered_ok": True}}
+    seeded_session.add(PlanRun(id="legacy", paycheck_date="2025-12-01", plan_json=json.dumps(payload)))
+    seeded_session.commit()
+
+    assert backfill_plan_analytics(seeded_session) == 1
+    assert backfill_plan_analytics(seeded_session) == 0
+    assert seeded_session.scalar(select(func.sum(PlanAllocation.amount_cents))) == 1234
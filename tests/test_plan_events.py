@@ -0,0 +1,50 @@
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from app.agent.payday_agent import generate_payday_plan
+from app.agent.plan_events import RESYNC, PlanBroadcaster, plan_broadcaster
+
+
+def test_publish_from_worker_thread_reaches_subscriber() -> None:
+    async def scenario() -> dict[str, object]:
+        broadcaster = PlanBroadcaster()
+        subscription = broadcaster.subscribe()
+        await asyncio.to_thread(broadcaster.publish, {"plan_id": "p1"})
+        return await asyncio.wait_for(subscription.get(), timeout=1)
+
+    assert asyncio.run(scenario()) == {"plan_id": "p1"}
+
+
+def test_slow_subscriber_is_told_to_resync_on_overflow() -> None:
+    async def scenario() -> list[dict[str, object]]:
+        broadcaster = PlanBroadcaster(queue_size=2)
+        subscription = broadcaster.subscribe()
+        for n in range(5):
+            broadcaster.publish({"plan_id": f"p{n}"})
+        await asyncio.sleep(0)
+        return [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+
+    assert asyncio.run(scenario()) == [RESYNC]
+
+
+def test_stored_plan_is_pushed_as_list_item(session_factory) -> None:
+    def create_plan() -> dict[str, object]:
+        with session_factory() as session:
+            return generate_payday_plan(session, Decimal("2390.43"), date(2026, 1, 5))
+
+    async def scenario() -> tuple[dict[str, object], dict[str, object]]:
+        subscription = plan_broadcaster.subscribe()
+        try:
+            plan = await asyncio.to_thread(create_plan)
+            return plan, await asyncio.wait_for(subscription.get(), timeout=1)
+        finally:
+            plan_broadcaster.unsubscribe(subscription)
+
+    plan, event = asyncio.run(scenario())
+    assert event["plan_id"] == plan["plan_id"]
+    assert set(event) == {"plan_id", "created_at", "paycheck_date", "paycheck_amount", "checks_summary"}
@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import func, select
+
+from app.db.models import Bill, PlanAllocation, PlanRun
+from app.db.synthetic import generate_synthetic_profile
+
+
+def generate(make_session_factory, name: str, seed: int) -> list[tuple]:
+    with make_session_factory(name)() as session:
+        counts = generate_synthetic_profile(session, seed=seed, bills=30, debts=3, plan_runs=250, batch_size=100)
+        assert counts["plan_runs"] == 250
+        assert session.scalar(select(func.count(PlanAllocation.id))) == 250 * 5
+        assert set(session.scalars(select(Bill.cadence).distinct())) == {"weekly", "biweekly", "monthly"}
+        rows = session.execute(select(PlanRun.id, PlanRun.paycheck_date, PlanRun.etag).order_by(PlanRun.id)).all()
+    return [tuple(row) for row in rows]
+
+
+def test_same_seed_generates_identical_history(make_session_factory) -> None:
+    assert generate(make_session_factory, "a.db", seed=7) == generate(make_session_factory, "b.db", seed=7)
+    assert generate(make_session_factory, "c.db", seed=8) != generate(make_session_factory, "d.db", seed=7)
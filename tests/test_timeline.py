@@ -0,0 +1,50 @@
+from datetime import date
+from decimal import Decimal
+
+from app.calculators.payday import due_amount
+from app.calculators.timeline import compute_timeline
+from app.domain.models import Bill
+from app.domain.tables import BillTable
+
+
+def bills() -> list[Bill]:
+    return [
+        Bill(id=1, name="Rent", amount=Decimal("1200.00"), cadence="monthly", due_day=31, autopay=True),
+        Bill(id=2, name="Internet", amount=Decimal("80.00"), cadence="monthly", due_day=10, autopay=True),
+        Bill(id=3, name="Groceries", amount=Decimal("100.00"), cadence="weekly", due_day=None, autopay=False, weekday_anchor=5),
+        Bill(id=4, name="Daycare", amount=Decimal("300.00"), cadence="biweekly", due_day=None, autopay=True),
+    ]
+
+
+def test_timeline_places_bills_on_due_dates_and_finds_overdraft() -> None:
+    start, end = date(2026, 2, 16), date(2026, 3, 2)
+    timeline = compute_timeline(bills(), Decimal("500.00"), start, end, Decimal("1000.00"))
+
+    days = {row["date"]: row for row in timeline["days"]}
+    assert len(days) == 14
+    assert days["2026-02-16"]["inflow"] == "500.00"
+    assert days["2026-02-16"]["outflow"] == "300.00"
+    assert days["2026-02-21"]["outflow"] == "100.00"
+    # Rent due on the 31st is clamped to Feb 28.
+    assert days["2026-02-28"]["outflow"] == "1300.00"
+    assert timeline["min_balance"] == "-200.00"
+    assert timeline["min_balance_date"] == "2026-02-28"
+    assert timeline["overdraft_days"] == ["2026-02-28", "2026-03-01"]
+
+
+def test_timeline_outflows_match_due_amounts() -> None:
+    start, end = date(2026, 1, 5), date(2026, 1, 19)
+    timeline = compute_timeline(BillTable.from_bills(bills()), Decimal("0"), start, end, Decimal("0"))
+    total_out = sum(Decimal(row["outflow"]) for row in timeline["days"])
+    assert total_out == sum(due_amount(b, start, end) for b in bills())
+    assert Decimal(timeline["end_balance"]) == -total_out
+
+
+def test_empty_period_has_empty_timeline_like_the_plan() -> None:
+    start = date(2026, 1, 5)
+    for end in (start, date(2026, 1, 1)):
+        timeline = compute_timeline(bills(), Decimal("500.00"), start, end, Decimal("1000.00"))
+        assert timeline["days"] == [] and timeline["overdraft_days"] == []
+        assert timeline["end_balance"] is None
+        dated = [b for b in bills() if b.cadence != "biweekly"]  # biweekly is charged once per plan
+        assert sum(due_amount(b, start, end) for b in dated) == 0
@@ -0,0 +1,115 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.calculators.payday import compute_plan
+from app.calculators.waterfall import DEFAULT_WATERFALLS, InvalidAllocationRules, compile_rules, waterfall_for_profile
+from app.domain.models import Bill, Debt
+
+
+def plan(waterfall=None, paycheck: str = "2500.00", starting_cash: str = "5000.00") -> dict[str, object]:
+    return compute_plan(
+        paycheck_amount=Decimal(paycheck),
+        paycheck_date=date(2026, 1, 5),
+        period_end=date(2026, 1, 19),
+        bills=[Bill(id=1, name="Internet", amount=Decimal("80.00"), cadence="monthly", due_day=10, autopay=True)],
+        debts=[Debt(id=1, name="Card", balance=Decimal("1800.00"), apr=Decimal("21.00"), min_payment=Decimal("65.00"))],
+        buffer_target=Decimal("600.00"),
+        min_cash_buffer=Decimal("2000.00"),
+        primary_surplus_target="invest",
+        starting_liquid_cash=Decimal(starting_cash),
+        waterfall=waterfall,
+    )
+
+
+def test_default_waterfall_matches_surplus_target_order() -> None:
+    assert [a["bucket"] for a in plan()["allocations"]] == ["Bills", "Spending", "DebtMinimum", "Invest", "ExtraDebt"]
+    assert plan(DEFAULT_WATERFALLS["invest"]) == plan()
+
+
+def test_custom_waterfall_applies_caps_percentages_and_targets() -> None:
+    waterfall = compile_rules(
+        [
+            {"bucket": "Bills", "source": "bills"},
+            {"bucket": "Invest", "source": "percent", "value": 10},
+            {"bucket": "Spending", "source": "buffer", "cap": "400.00"},
+            {"bucket": "DebtMinimum", "source": "debt_minimums"},
+            {"bucket": "Vacation", "source": "target", "value": "150.00"},
+            {"bucket": "Savings", "source": "remainder"},
+        ]
+    )
+    result = plan(waterfall)
+    buckets = {a["bucket"]: a["amount"] for a in result["allocations"]}
+    assert buckets == {
+        "Bills": Decimal("80.00"),
+        "Invest": Decimal("250.00"),
+        "Spending": Decimal("400.00"),
+        "DebtMinimum": Decimal("65.00"),
+        "Vacation": Decimal("150.00"),
+        "Savings": Decimal("1555.00"),
+    }
+    assert result["checks"]["allocations_sum_ok"] is True
+    assert result["checks"]["buffer_met_ok"] is False
+
+
+def test_safe_to_invest_is_one_budget_shared_by_discretionary_rules() -> None:
+    waterfall = compile_rules(
+        [
+            {"bucket": "Bills", "source": "bills"},
+            {"bucket": "Spending", "source": "buffer"},
+            {"bucket": "DebtMinimum", "source": "debt_minimums"},
+            {"bucket": "Invest", "source": "safe_to_invest"},
+            {"bucket": "EmergencyFund", "source": "safe_to_invest"},
+            {"bucket": "ExtraDebt", "source": "remainder"},
+        ]
+    )
+    result = plan(waterfall, starting_cash="1000.00")
+    buckets = {a["bucket"]: a["amount"] for a in result["allocations"]}
+    assert result["safe_to_invest"] == Decimal("755.00")
+    assert buckets["Invest"] == Decimal("755.00")
+    assert buckets["EmergencyFund"] == Decimal("0.00")
+    assert result["checks"]["min_cash_buffer_met_ok"] is True
+
+
+def test_percent_and_target_rules_draw_down_safe_to_invest() -> None:
+    rules = [
+        {"bucket": "Bills", "source": "bills"},
+        {"bucket": "Spending", "source": "buffer"},
+        {"bucket": "DebtMinimum", "source": "debt_minimums"},
+        {"bucket": "Vacation", "source": "percent", "value": 10},
+        {"bucket": "Invest", "source": "safe_to_invest"},
+        {"bucket": "ExtraDebt", "source": "remainder"},
+    ]
+    buckets = {a["bucket"]: a["amount"] for a in plan(compile_rules(rules), starting_cash="1000.00")["allocations"]}
+    assert buckets["Vacation"] == Decimal("250.00")
+    assert buckets["Invest"] == Decimal("505.00")
+
+    rules[3] = {"bucket": "Vacation", "source": "target", "value": "900.00"}
+    result = plan(compile_rules(rules), starting_cash="1000.00")
+    assert {a["bucket"]: a["amount"] for a in result["allocations"]}["Invest"] == Decimal("0.00")
+    assert result["checks"]["min_cash_buffer_met_ok"] is False
+
+
+@pytest.mark.parametrize(
+    "rules",
+    [
+        [],
+        [{"bucket": "Bills", "source": "bills"}],
+        [{"bucket": "Rest", "source": "remainder"}, {"bucket": "Bills", "source": "bills"}],
+        [{"bucket": "A", "source": "percent", "value": 120}, {"bucket": "B", "source": "remainder"}],
+        [{"bucket": "A", "source": "bills"}, {"bucket": "B", "source": "bills"}, {"bucket": "C", "source": "remainder"}],
+        [{"bucket": "A", "source": "target"}, {"bucket": "B", "source": "remainder"}],
+        [{"bucket": "A", "source": "bills"}, {"bucket": "B", "source": "remainder", "cap": "10"}],
+    ],
+)
+def test_invalid_rules_are_rejected(rules) -> None:
+    with pytest.raises(InvalidAllocationRules):
+        compile_rules(rules)
+
+
+def test_compiled_waterfall_is_cached_per_profile_version() -> None:
+    rules_json = '[{"bucket": "Everything", "source": "remainder"}]'
+    first = waterfall_for_profile(42, 1, rules_json)
+    assert waterfall_for_profile(42, 1, rules_json) is first
+    assert waterfall_for_profile(42, 2, rules_json) is not first